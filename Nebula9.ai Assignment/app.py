@@ -1,14 +1,38 @@
 import os
+import io
+import hashlib
 import subprocess
-import re
-from flask import Flask, request, render_template, jsonify
+import json
+import queue
+import shutil
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, render_template, jsonify, url_for, g, Response
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from datetime import datetime
-import uuid
+from functools import lru_cache
+import threading
+import time
 
-# Importing Hugging Face Transformers for LLaMA
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
+from extractive import extract_sentences, split_sentences, top_sentences
+from fast_analyzer import analyze_file as analyze_python_fast, analyze_source as analyze_python_source_fast
+from findings import Finding, digest_findings, format_finding, format_findings, parse_findings
+from incremental import ModuleUnits, merge_findings, plan_reanalysis, snapshot, stub_source
+from jobs import JobQueue, QueueFull, report_progress, report_timings
+from linter_executor import LinterExecutor, LinterQueueFull
+from metrics import REGISTRY, add_timing, server_timing_header, stage_timer, start_timings, stop_timings
+from project_upload import ProjectLimitError, ProjectWriter, archive_extension, group_by_extension
+from pylint_engine import PylintEngine, PylintEngineError
+from result_cache import ResultCache, file_digest, make_cache_key
+from summarizer import (
+    SummaryBatcher, load_summarization_pipeline, load_summary_tokenizer, stream_summary, summarize_long_text,
+)
+from summary_service import SummaryClient, SummaryServerUnavailable
+from taxonomy import Taxonomy
+from text_extraction import DocumentText, TEXT_DOCUMENT_TYPES
+from upload_store import UploadStore
 
 app = Flask(__name__)
 CORS(app)
@@ -17,138 +41,595 @@ UPLOAD_FOLDER = "upload"
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+# Largest request body accepted; bigger uploads are answered with 413 before they are stored
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_CONTENT_LENGTH", str(64 * 1024 * 1024)))
+
+# Uploads are stored by content under UPLOAD_FOLDER; a background pass removes those unused for
+# UPLOAD_TTL_SECONDS, then the least recently used ones while the store exceeds UPLOAD_STORE_MAX_BYTES.
+# serve.py sets UPLOAD_RETENTION_THREAD=0 and starts the pass in each worker from gunicorn's post_fork hook
+UPLOAD_STORE = UploadStore(
+    UPLOAD_FOLDER,
+    ttl_seconds=int(os.environ.get("UPLOAD_TTL_SECONDS", str(24 * 3600))),
+    max_bytes=int(os.environ.get("UPLOAD_STORE_MAX_BYTES", str(1024 * 1024 * 1024))),
+    interval_seconds=int(os.environ.get("UPLOAD_RETENTION_INTERVAL", "600")),
+    retention_thread=os.environ.get("UPLOAD_RETENTION_THREAD", "1") != "0",
+)
+
+# Code uploads up to this size are analyzed from memory: linters read them from stdin or a memory file
+MEMORY_ANALYSIS_MAX_BYTES = int(os.environ.get("MEMORY_ANALYSIS_MAX_BYTES", str(500 * 1024)))
+MEMORY_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, "memory")  # Never created: only names findings
+
+# PERSIST_UPLOADS=0 keeps uploads analyzed from memory off disk, and the result caches in memory only
+PERSIST_UPLOADS = os.environ.get("PERSIST_UPLOADS", "1") != "0"
+
+# Static analysis results are cached by file content and linter version
+CACHE_FOLDER = os.environ.get("CACHE_FOLDER", "cache")
+ANALYSIS_CACHE = ResultCache(
+    os.path.join(CACHE_FOLDER, "analysis") if PERSIST_UPLOADS else None,
+    max_memory_entries=int(os.environ.get("ANALYSIS_CACHE_ENTRIES", "256")),
+    max_disk_bytes=int(os.environ.get("ANALYSIS_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+)
+
+# Static analysis summaries are cached by normalized summarizer input, model and generation parameters
+SUMMARY_CACHE = ResultCache(
+    os.path.join(CACHE_FOLDER, "summaries") if PERSIST_UPLOADS else None,
+    max_memory_entries=int(os.environ.get("SUMMARY_CACHE_ENTRIES", "1024")),
+    max_disk_bytes=int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Per-definition findings of the last version of each uploaded Python file name, for incremental
+# re-analysis of new versions (INCREMENTAL_ANALYSIS=0 disables it)
+INCREMENTAL_ANALYSIS = os.environ.get("INCREMENTAL_ANALYSIS", "1") != "0"
+VERSION_CACHE = ResultCache(
+    os.path.join(CACHE_FOLDER, "versions") if PERSIST_UPLOADS else None,
+    max_memory_entries=int(os.environ.get("VERSION_CACHE_ENTRIES", "256")),
+    max_disk_bytes=int(os.environ.get("VERSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Uploads are analyzed by a bounded pool of background workers
+JOB_QUEUE = JobQueue(
+    workers=int(os.environ.get("JOB_WORKERS", "2")),
+    max_queue=int(os.environ.get("JOB_QUEUE_SIZE", "32")),
+)
+JOB_RETRY_AFTER = 5  # Seconds a client should wait when the queue is full
+
+# Linter processes running at a time, overall and per tool (LINTER_TOOL_LIMITS="pylint=4,cppcheck=2"),
+# and how many linter runs may wait for a slot before code uploads are answered with 429
+LINTER_EXECUTOR = LinterExecutor(
+    max_processes=int(os.environ.get("LINTER_MAX_PROCESSES", str(os.cpu_count() or 1))),
+    tool_limits={
+        tool.strip(): int(limit)
+        for tool, _, limit in (item.partition("=") for item in os.environ.get("LINTER_TOOL_LIMITS", "").split(","))
+        if limit
+    },
+    max_waiting=int(os.environ.get("LINTER_QUEUE_SIZE", "64")),
+)
+
+# Resident pylint workers replace a pylint subprocess per upload (PYLINT_ENGINE=0 disables them)
+PYLINT_ENGINE = None
+if os.environ.get("PYLINT_ENGINE", "1") != "0":
+    PYLINT_ENGINE = PylintEngine(
+        workers=int(os.environ.get("PYLINT_ENGINE_WORKERS", os.environ.get("JOB_WORKERS", "2"))),
+        max_jobs=int(os.environ.get("PYLINT_ENGINE_MAX_JOBS", "200")),
+    )
+
+# Metrics exposed at /metrics (stage timings are recorded by metrics.stage_timer)
+REQUESTS_TOTAL = REGISTRY.counter("codesentry_requests_total", "HTTP requests served.", ["endpoint", "status"])
+REQUEST_SECONDS = REGISTRY.histogram("codesentry_request_seconds", "HTTP request latency.", ["endpoint"])
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("codesentry_requests_in_flight", "HTTP requests being served.")
+JOBS_IN_FLIGHT = REGISTRY.gauge("codesentry_jobs", "Analysis jobs waiting or running.", ["state"])
+CACHE_LOOKUPS = REGISTRY.counter("codesentry_cache_lookups_total", "Cache lookups by result.", ["cache", "result"])
+SUMMARY_BATCHES = REGISTRY.counter("codesentry_summary_batches_total", "Summarizer batches by size.", ["size"])
+SUMMARY_QUEUE_WAIT = REGISTRY.gauge("codesentry_summary_queue_wait_seconds", "Summarizer queue wait.", ["stat"])
+MODEL_LOAD_SECONDS = REGISTRY.gauge("codesentry_model_load_seconds", "Time taken to load the summarization model.")
+INCREMENTAL_ANALYSES = REGISTRY.counter(
+    "codesentry_python_analyses_total", "pylint analyses of uploaded files, full or incremental.", ["mode"]
+)
+UPLOADS_STORED = REGISTRY.counter(
+    "codesentry_uploads_stored_total", "Single-file uploads stored, new or deduplicated.", ["result"]
+)
+UPLOAD_RECLAIMED_BYTES = REGISTRY.counter(
+    "codesentry_upload_reclaimed_bytes_total", "Bytes of uploads removed by the retention pass."
+)
+LINTER_PROCESSES = REGISTRY.gauge(
+    "codesentry_linter_processes", "Linter process slots in use (running) and runs waiting for one.", ["tool", "state"]
+)
+LINTER_LIMIT = REGISTRY.gauge("codesentry_linter_limit", "Linter process limit by tool (all: overall).", ["tool"])
+LINTER_BUSY_SECONDS = REGISTRY.counter(
+    "codesentry_linter_busy_seconds_total", "Process-seconds of linter slots held, by tool.", ["tool"]
+)
+LINTER_WAIT_SECONDS = REGISTRY.counter(
+    "codesentry_linter_wait_seconds_total", "Seconds linter runs waited for a slot, by tool.", ["tool"]
+)
+LINTER_REJECTED = REGISTRY.counter("codesentry_linter_rejected_total", "Linter runs rejected by a full queue.")
+LINTER_UTILIZATION = REGISTRY.gauge(
+    "codesentry_linter_utilization", "Busy linter process-seconds over the process limit since start."
+)
+MODEL_READY = REGISTRY.gauge("codesentry_model_ready", "1 when the summarization model is loaded.")
+SUMMARIES = REGISTRY.counter(
+    "codesentry_summaries_total", "Summaries by method, and why extractive ones were not left to the model.",
+    ["method", "reason"],
+)
+SUMMARY_ESTIMATE = REGISTRY.gauge(
+    "codesentry_summary_estimated_seconds", "Expected time for a summary by the model requested now."
+)
+
+# Static analysis command for each supported file type, in the tool's machine-readable output mode
+# (parsed into findings.Finding records by findings.parse_findings)
+STATIC_ANALYZERS = {
+    ".py": ["pylint", "--output-format=json"],
+    ".js": ["eslint", "-f", "json"],
+    ".cpp": ["cppcheck", "--enable=all", "--xml"],
+    ".html": ["tidy", "-errors", "-quiet", "--mute-id", "yes"],
+}
+
+# Arguments for linting text read from stdin, reported under {path} (tidy reads stdin without a file)
+STDIN_ARGS = {
+    "pylint": ["--from-stdin", "{path}"],
+    "eslint": ["--stdin", "--stdin-filename", "{path}"],
+    "tidy": [],
+}
+
+# Tools that only read files are given an anonymous memory file (memfd), whose name has no
+# extension to tell the language by
+MEMFD_ARGS = {"cppcheck": ["--language=c++"]}
+
+# Finding categories shown on the page, and the rule-ID/keyword mapping into them (loaded once)
+CATEGORIES = ["Readability", "Code Quality", "Error"]
+TAXONOMY_FILE = os.environ.get(
+    "TAXONOMY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+)
+TAXONOMY = Taxonomy.load(TAXONOMY_FILE, CATEGORIES)
+
+# Multi-file and archive uploads: extraction limits, and the parallelism and timeout of each linter run
+PROJECT_MAX_FILES = int(os.environ.get("PROJECT_MAX_FILES", "500"))
+PROJECT_MAX_BYTES = int(os.environ.get("PROJECT_MAX_BYTES", str(50 * 1024 * 1024)))
+PROJECT_LINT_JOBS = int(os.environ.get("PROJECT_LINT_JOBS", str(os.cpu_count() or 1)))
+PROJECT_LINT_TIMEOUT = int(os.environ.get("PROJECT_LINT_TIMEOUT", "300"))
+
+# Extra flags for linting a group of files in one invocation ({jobs}: the parallel jobs granted by
+# LINTER_EXECUTOR, at most PROJECT_LINT_JOBS); other tools run once per file
+BATCH_FLAGS = {
+    "pylint": ["-j", "{jobs}"],
+    "cppcheck": ["-j", "{jobs}"],
+    "eslint": [],
+}
+
 # Global variable for LLM model to avoid reloading on every request
 CODE_INTERPRETER = None
+SUMMARY_TOKENIZER = None  # The model's tokenizer alone, when summaries come from the summarization server
+
+# Summarization model and its CPU inference backend: fp32, int8 (dynamic quantization) or bf16
+SUMMARIZER_MODEL = os.environ.get("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+SUMMARIZER_BACKEND = os.environ.get("SUMMARIZER_BACKEND", "fp32")
+
+# Load state of CODE_INTERPRETER, reported by /healthz and /readyz
+MODEL_STATE = {"status": "not_loaded", "backend": None, "load_seconds": None, "error": None}
+
+# The model is loaded on a background thread when the app is created (SUMMARIZER_WARMUP=0 disables this)
+SUMMARIZER_WARMUP = os.environ.get("SUMMARIZER_WARMUP", "1") != "0"
+
+# Set by serve.py, which loads the model in its master process before forking the workers
+SUMMARIZER_PRELOAD = os.environ.get("SUMMARIZER_PRELOAD", "0") == "1"
+
+# Concurrent summarization requests share one batched pipeline call
+SUMMARY_BATCHER = SummaryBatcher(
+    lambda: CODE_INTERPRETER,
+    max_batch_size=int(os.environ.get("SUMMARY_BATCH_SIZE", "8")),
+    max_wait_ms=float(os.environ.get("SUMMARY_BATCH_WAIT_MS", "20")),
+)
+
+# With SUMMARY_SERVER_SOCKET set, summaries are generated by summary_service.py behind that Unix socket
+# and this process loads only the tokenizer; a summary may take up to SUMMARY_SERVER_TIMEOUT seconds
+SUMMARY_SERVER_SOCKET = os.environ.get("SUMMARY_SERVER_SOCKET", "")
+SUMMARY_CLIENT = None
+if SUMMARY_SERVER_SOCKET:
+    SUMMARY_CLIENT = SummaryClient(
+        SUMMARY_SERVER_SOCKET,
+        pool_size=int(os.environ.get("SUMMARY_SERVER_CONNECTIONS", "2")),
+        timeout=float(os.environ.get("SUMMARY_SERVER_TIMEOUT", "120")),
+    )
+SUMMARIZER = SUMMARY_CLIENT or SUMMARY_BATCHER  # Where summaries are generated
+
+# Long documents are summarized in token-bounded chunks, then the chunk summaries are summarized
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "900"))
+SUMMARY_MAX_CHUNKS = int(os.environ.get("SUMMARY_MAX_CHUNKS", "16"))
+
+# Token budget of the findings digest given to the summarizer (BART reads at most 1024 tokens)
+SUMMARY_DIGEST_TOKENS = int(os.environ.get("SUMMARY_DIGEST_TOKENS", "512"))
+
+# /upload/stream sends the static analysis summary token by token (greedy decoding) when set to 1
+SUMMARY_STREAM_TOKENS = os.environ.get("SUMMARY_STREAM_TOKENS", "0") == "1"
+
+# Latency budget of an analysis in milliseconds from its upload (0: none); an upload may set its own with
+# summary_budget_ms. When the model is not expected to summarize within the time left, or is not available,
+# an extractive summary of EXTRACTIVE_SUMMARY_SENTENCES sentences (or findings) is given instead
+SUMMARY_LATENCY_BUDGET_MS = float(os.environ.get("SUMMARY_LATENCY_BUDGET_MS", "0"))
+EXTRACTIVE_SUMMARY_SENTENCES = int(os.environ.get("EXTRACTIVE_SUMMARY_SENTENCES", "5"))
+
+# Reading budget for .txt/.docx/.pdf uploads
+DOCUMENT_MAX_PAGES = int(os.environ.get("DOCUMENT_MAX_PAGES", "500"))
+DOCUMENT_MAX_BYTES = int(os.environ.get("DOCUMENT_MAX_BYTES", str(20 * 1024 * 1024)))
 
 def initialize_code_interpreter():
     """
     Initialize BART for summarization and suggestions.
+    torch and transformers are imported here (through load_summarization_pipeline) rather than at module level,
+    so the app starts serving linter results without waiting for them.
     """
-    global CODE_INTERPRETER
+    global CODE_INTERPRETER, SUMMARY_TOKENIZER
+    MODEL_STATE.update(status="loading", error=None)
+    started = time.monotonic()
     try:
-        import torch  # Ensure torch is imported within the function
+        if SUMMARY_CLIENT is not None:
+            # The model lives in the summarization server; chunking and token counts need the tokenizer
+            print(f"Loading the {SUMMARIZER_MODEL} tokenizer; summaries come from {SUMMARY_SERVER_SOCKET}")
+            SUMMARY_TOKENIZER = load_summary_tokenizer(SUMMARIZER_MODEL)
+            MODEL_STATE.update(status="ready", backend="server", load_seconds=time.monotonic() - started)
+            return
 
-        model_name = "facebook/bart-large-cnn"  # BART model fine-tuned for summarization
-        print("Loading BART model for summarization. This may take a moment...")
+        print(f"Loading BART model for summarization ({SUMMARIZER_BACKEND}). This may take a moment...")
 
-        # Create a pipeline for summarization
-        CODE_INTERPRETER = pipeline(
-            "summarization",
-            model=model_name,
-            device=0 if torch.cuda.is_available() else -1  # Use GPU if available, otherwise CPU
-        )
+        # Create a pipeline for summarization (GPU if available, otherwise CPU)
+        CODE_INTERPRETER, backend = load_summarization_pipeline(SUMMARIZER_MODEL, SUMMARIZER_BACKEND)
+        MODEL_STATE.update(status="ready", backend=backend, load_seconds=time.monotonic() - started)
         print("BART Model Loaded Successfully!")
     except ImportError as e:
+        MODEL_STATE.update(status="failed", error=str(e))
         print(f"PyTorch is not installed or cannot be imported. Error: {e}")
     except Exception as e:
+        MODEL_STATE.update(status="failed", error=str(e))
         print(f"Error loading BART model: {e}")
         CODE_INTERPRETER = None
 
+def start_model_warmup():
+    """
+    Load the summarization model on a background thread.
+    """
+    MODEL_STATE["status"] = "loading"
+    threading.Thread(target=initialize_code_interpreter, name="model-warmup", daemon=True).start()
 
 
-def preprocess_static_analysis(static_analysis_result):
+def summary_tokenizer():
+    """
+    The summarization model's tokenizer, or None while it is not loaded.
+    """
+    if CODE_INTERPRETER is not None:
+        return CODE_INTERPRETER.tokenizer
+    return SUMMARY_TOKENIZER
+
+def count_summary_tokens(text):
+    """
+    Length of summarizer input in model tokens, or in words while the model is not loaded.
+    """
+    tokenizer = summary_tokenizer()
+    if tokenizer is None:
+        return len(text.split())
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+def use_abstractive_summary(deadline, calls=1):
     """
-    Clean and preprocess static analysis results:
-    - Extract everything after the second colon.
-    - Remove content inside parentheses.
-    - Remove warning codes (e.g., W0108, C0301).
+    Whether to have the model summarize, given the summary's deadline (time.monotonic(), or None)
+    and the number of consecutive model calls it takes; otherwise an extractive summary is given.
     """
-    relevant_lines = []
-    for line in static_analysis_result.split("\n"):
-        # Match lines with issues and extract everything after the second colon
-        parts = line.split(":", maxsplit=3)
-        if len(parts) > 2:  # Ensure there are enough parts
-            issue_description = parts[3].strip()  # Take everything after the second colon
-            
-            # Remove content inside parentheses
-            issue_description = re.sub(r"\(.*?\)", "", issue_description).strip()
-            
-            # Remove warning codes (e.g., W0108)
-            issue_description = re.sub(r"^[A-Z]\d{4}:\s*", "", issue_description).strip()
-            
-            relevant_lines.append(issue_description)
-    
-    # Limit to first 30 cleaned lines for brevity
-    return "\n".join(relevant_lines[:30])
+    if summary_tokenizer() is None:
+        reason = "loading" if MODEL_STATE["status"] == "loading" else "unavailable"
+    elif SUMMARY_CLIENT is not None and not SUMMARY_CLIENT.available():
+        reason = "unavailable"
+    elif deadline is not None and time.monotonic() + calls * (SUMMARIZER.estimate_seconds() or 0) > deadline:
+        reason = "budget"
+    else:
+        SUMMARIES.inc(method="abstractive", reason="none")
+        return True
+    SUMMARIES.inc(method="extractive", reason=reason)
+    return False
 
-def llm_static_analysis_summary(static_analysis_result):
+def fall_back_to_extractive(error):
     """
-    Use BART to summarize preprocessed static analysis results and suggest improvements.
+    Record that a model summary failed (or missed its deadline) and an extractive one is given instead.
     """
-    if CODE_INTERPRETER is None:
-        return "LLM model not available for summarizing static analysis results."
+    print(f"Summary by the model failed, giving an extractive summary: {error}")
+    if isinstance(error, TimeoutError):
+        reason = "deadline"
+    elif isinstance(error, SummaryServerUnavailable):
+        reason = "unavailable"
+    else:
+        reason = "error"
+    SUMMARIES.inc(method="extractive", reason=reason)
 
+def request_deadline():
+    """
+    Deadline (time.monotonic()) of the current upload's analysis, from the summary_budget_ms form field
+    or query parameter, or SUMMARY_LATENCY_BUDGET_MS; None without a budget.
+    """
     try:
-        # Preprocess the input
-        filtered_results = preprocess_static_analysis(static_analysis_result)
+        budget_ms = float(request.values.get("summary_budget_ms", SUMMARY_LATENCY_BUDGET_MS))
+    except ValueError:
+        budget_ms = SUMMARY_LATENCY_BUDGET_MS
+    return time.monotonic() + budget_ms / 1000 if budget_ms > 0 else None
+
+def preprocess_static_analysis(findings):
+    """
+    Build the summarizer input from findings: a digest with one line per rule,
+    ranked by severity and frequency, within SUMMARY_DIGEST_TOKENS.
+    """
+    return digest_findings(findings, count_summary_tokens, SUMMARY_DIGEST_TOKENS)
+
+def normalize_summary_input(text):
+    """
+    Collapse whitespace and drop blank lines, so equivalent summarizer inputs share a cache key.
+    """
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+# Generation parameters for static analysis summaries
+STATIC_ANALYSIS_SUMMARY_KWARGS = {
+    "max_length": 150,  # Adjust based on desired summary length
+    "min_length": 30,
+    "do_sample": False,  # Ensure deterministic output
+}
+
+def extractive_static_analysis_summary(findings, filtered_results):
+    """
+    Summary of the findings without the model: their number, then the digest lines that best
+    represent the rest, ranked with a bias towards the most severe and frequent rules.
+    """
+    lines = filtered_results.splitlines()
+    chosen = top_sentences(lines, EXTRACTIVE_SUMMARY_SENTENCES, prior=[1 / (rank + 1) for rank in range(len(lines))])
+    kinds = len({finding.rule for finding in findings})
+    return (f"Static analysis found {len(findings)} issues of {kinds} kinds. Most significant:\n"
+            + "\n".join(lines[index] for index in chosen))
+
+def prepare_static_analysis_summary(findings, deadline=None):
+    """
+    Preprocess findings for summarization.
+    Returns (summarizer input, cache key, ready answer); the ready answer is set
+    when no model call is needed (nothing to summarize, cache hit), or is an extractive
+    summary when the model is unavailable or not expected to answer by deadline.
+    """
+    # Preprocess the input
+    with stage_timer("preprocess"):
+        filtered_results = preprocess_static_analysis(findings)
+
+    if not filtered_results:
+        return None, None, "No relevant warnings or errors found in the static analysis results."
+
+    cache_key = make_cache_key(
+        normalize_summary_input(filtered_results), SUMMARIZER_MODEL, SUMMARIZER_BACKEND,
+        STATIC_ANALYSIS_SUMMARY_KWARGS,
+    )
+    cached = SUMMARY_CACHE.get(cache_key)
+    if cached is not None:
+        return filtered_results, cache_key, cached
+
+    if not use_abstractive_summary(deadline):
+        return filtered_results, cache_key, extractive_static_analysis_summary(findings, filtered_results)
+
+    return filtered_results, cache_key, None
 
-        if not filtered_results:
-            return "No relevant warnings or errors found in the static analysis results."
+def llm_static_analysis_summary(findings, deadline=None):
+    """
+    Use BART to summarize preprocessed static analysis findings and suggest improvements.
+    Summaries are cached on the normalized input, model and generation parameters,
+    so repeated warning patterns skip the model entirely.
+    Without the model, or when it cannot answer by deadline, the summary is extractive.
+    """
+    try:
+        filtered_results, cache_key, answer = prepare_static_analysis_summary(findings, deadline)
+        if answer is not None:
+            return answer
 
         # Generate summary using BART
-        summary = CODE_INTERPRETER(
-            filtered_results, 
-            max_length=150,  # Adjust based on desired summary length
-            min_length=30, 
-            do_sample=False  # Ensure deterministic output
-        )
-        return summary[0]['summary_text']
+        try:
+            summary = SUMMARIZER.summarize(filtered_results, deadline=deadline, **STATIC_ANALYSIS_SUMMARY_KWARGS)
+        except Exception as e:
+            fall_back_to_extractive(e)
+            return extractive_static_analysis_summary(findings, filtered_results)
+        SUMMARY_CACHE.put(cache_key, summary)
+        return summary
 
     except Exception as e:
         return f"Error generating summary: {str(e)}"
 
-
-def analyze_code(file_path):
+def stream_static_analysis_summary(findings, deadline=None):
     """
-    Perform static code analysis based on file type.
+    Like llm_static_analysis_summary, but yields the summary in pieces.
+    With SUMMARY_STREAM_TOKENS the model output is streamed token by token (when the model
+    runs in this process); otherwise the (batched, cached) summary is yielded whole.
     """
     try:
-        # Supported static analysis tools for different file types
-        if file_path.endswith(".py"):
-            result = subprocess.run(["pylint", "--output-format=text", file_path], 
-                                    capture_output=True, text=True, timeout=30)
-            return result.stdout
-        elif file_path.endswith(".js"):
-            result = subprocess.run(["eslint", file_path], 
-                                    capture_output=True, text=True, timeout=30)
-            return result.stdout
-        elif file_path.endswith(".cpp"):
-            result = subprocess.run(["cppcheck", "--enable=all", file_path], 
-                                    capture_output=True, text=True, timeout=30)
-            return result.stdout
-        elif file_path.endswith(".html"):
-            result = subprocess.run(["tidy", "-errors", "-quiet", file_path], 
-                                    capture_output=True, text=True, timeout=30)
-            return result.stdout
+        filtered_results, _cache_key, answer = prepare_static_analysis_summary(findings, deadline)
+        if answer is not None:
+            yield answer
+        elif SUMMARY_STREAM_TOKENS and CODE_INTERPRETER is not None:
+            yield from stream_summary(CODE_INTERPRETER, filtered_results, **STATIC_ANALYSIS_SUMMARY_KWARGS)
         else:
-            return "Unsupported file type for static analysis"
+            yield llm_static_analysis_summary(findings, deadline)
+    except Exception as e:
+        yield f"Error generating summary: {str(e)}"
+
+
+@lru_cache(maxsize=None)
+def get_tool_version(tool):
+    """
+    Return the version string reported by a static analysis tool (cached per process).
+    """
+    try:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=30)
+        return (result.stdout or result.stderr).strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unavailable"
+
+
+def analysis_error(file_path, message):
+    """
+    Finding reporting that static analysis could not be run.
+    """
+    return Finding(file_path, 0, 0, "analysis-error", "error", message)
+
+def analysis_failed(tool, findings):
+    """
+    Whether findings include a report that the analysis or the tool itself failed.
+    """
+    return any(finding.rule in ("analysis-error", f"{tool}-error") for finding in findings)
+
+def analyze_code(file_path, source_name=None, content=None):
+    """
+    Perform static code analysis based on file type and return its findings.
+    Results are cached on the SHA-256 of the file and its module name plus the linter name,
+    version and flags, so identical uploads skip the linter subprocess.
+    A Python file with the source_name (uploaded file name) of an earlier upload is
+    analyzed incrementally against that upload.
+    With content (the file's bytes), file_path only names the file and nothing is read from disk.
+    """
+    command = STATIC_ANALYZERS.get(os.path.splitext(file_path)[1])
+    if command is None:
+        return [analysis_error(file_path, "Unsupported file type for static analysis")]
+
+    tool, flags = command[0], command[1:]
+    try:
+        with stage_timer(f"analyze_code:{tool}"):
+            digest = file_digest(file_path) if content is None else hashlib.sha256(content).hexdigest()
+            # Messages may mention the module name (e.g. invalid-name), so it is part of the key
+            module_name = os.path.splitext(os.path.basename(file_path))[0]
+            cache_key = make_cache_key(digest, module_name, tool, get_tool_version(tool), flags)
+            cached = ANALYSIS_CACHE.get(cache_key)
+            if cached is not None:
+                # Cached findings are stored without a file; they are reported under the current upload
+                return [Finding(file_path, *finding[1:]) for finding in cached]
+
+            if tool == "pylint" and source_name and INCREMENTAL_ANALYSIS:
+                findings = analyze_python_incrementally(command, file_path, source_name, content)
+            else:
+                findings = run_static_analyzer(command, [file_path], content=content)
+            # A failed run may be transient (config error, crash), so it is not cached for this content
+            if not analysis_failed(tool, findings):
+                ANALYSIS_CACHE.put(cache_key, [finding._replace(file=None) for finding in findings])
+            return findings
+    except LinterQueueFull:
+        raise  # The server is overloaded: fail the request rather than report it as a finding
     except subprocess.TimeoutExpired:
-        return f"{os.path.basename(file_path)} analysis timed out"
+        return [analysis_error(file_path, f"{os.path.basename(file_path)} analysis timed out")]
     except Exception as e:
-        return f"Error during static analysis: {str(e)}"
+        return [analysis_error(file_path, f"Error during static analysis: {str(e)}")]
 
-def analyze_text_file(file_path):
+def analyze_python_incrementally(command, file_path, source_name, content=None):
     """
-    Analyze and summarize the content of .doc, .txt, and .pdf files using BART.
-    Automatically wraps lines after 150 characters for better readability.
+    Lint a Python file, reusing the findings of the top-level functions and classes that did
+    not change since the last file uploaded under the same name (see incremental.py).
+    The whole file is linted when there is no earlier version or module-level code changed.
     """
+    tool, flags = command[0], command[1:]
+    version_key = make_cache_key(source_name, tool, get_tool_version(tool), flags)
+    if content is None:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    else:
+        source = content.decode("utf-8", errors="replace")
     try:
-        # Extract content based on file type
-        if file_path.endswith(".txt"):
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+        units = ModuleUnits(source)
+    except (SyntaxError, ValueError):
+        return run_static_analyzer(command, [file_path], content=content)
 
-        elif file_path.endswith(".docx"):
-            from docx import Document  # Import for .docx files
-            doc = Document(file_path)
-            content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    previous = VERSION_CACHE.get(version_key)
+    reusable = plan_reanalysis(previous, units)
+    if not reusable:
+        INCREMENTAL_ANALYSES.inc(mode="full")
+        findings = run_static_analyzer(command, [file_path], content=content)
+    else:
+        INCREMENTAL_ANALYSES.inc(mode="incremental")
+        # The stubbed source is linted from memory under the file's own name
+        fresh = run_static_analyzer(command, [file_path], content=stub_source(units, reusable).encode("utf-8"))
+        findings = merge_findings(fresh, units, reusable, previous, file_path)
 
-        elif file_path.endswith(".pdf"):
-            from PyPDF2 import PdfReader  # Import for .pdf files
-            reader = PdfReader(file_path)
-            content = "\n".join(page.extract_text() for page in reader.pages)
+    # A failed run says nothing about the definitions, so it is not kept for the next version
+    if not analysis_failed(tool, findings):
+        VERSION_CACHE.put(version_key, snapshot(units, findings))
+    return findings
 
-        else:
+def run_static_analyzer(command, file_paths, timeout=30, content=None, processes=1, batch_flags=()):
+    """
+    Run a static analysis command on one or more files and parse its output into findings.
+    The run holds up to processes slots of LINTER_EXECUTOR (waiting for them if needed);
+    batch_flags are added to the command with {jobs} set to the number of slots granted.
+    Single-file pylint runs go to the resident engine when available; everything else
+    (including parallel pylint -j batches) runs as a subprocess.
+    With content (bytes), file_paths is the one name findings are reported under, and the
+    tool reads content from stdin (STDIN_ARGS) or from a memory file instead of the disk.
+    """
+    with LINTER_EXECUTOR.slot(command[0], processes) as jobs:
+        command = command + [flag.format(jobs=jobs) for flag in batch_flags]
+        return run_linter_process(command, file_paths, timeout, content)
+
+def run_linter_process(command, file_paths, timeout, content):
+    """
+    Run one linter invocation for run_static_analyzer, once it holds its slots.
+    """
+    tool = command[0]
+    if content is not None and tool not in STDIN_ARGS:
+        return run_static_analyzer_on_memfd(command, file_paths[0], content, timeout)
+
+    arguments = file_paths
+    if content is not None:
+        arguments = [argument.format(path=file_paths[0]) for argument in STDIN_ARGS[tool]]
+    if tool == "pylint" and PYLINT_ENGINE is not None and len(file_paths) == 1:
+        stdin = content.decode("utf-8", errors="replace") if content is not None else None
+        try:
+            stdout = PYLINT_ENGINE.run(command[1:] + arguments, timeout=timeout, stdin=stdin)
+            return parse_findings(tool, stdout, "", file_paths)
+        except PylintEngineError as e:
+            print(f"Resident pylint unavailable, falling back to subprocess: {e}")
+
+    result = subprocess.run(command + arguments, input=content,
+                            capture_output=True, timeout=timeout)
+    return parse_findings(tool, result.stdout.decode("utf-8", errors="replace"),
+                          result.stderr.decode("utf-8", errors="replace"), file_paths)
+
+def run_static_analyzer_on_memfd(command, file_path, content, timeout=30):
+    """
+    Lint content held in memory with a tool that only reads files: the tool is given an
+    anonymous memory-backed file (memfd) by its /proc path, and findings for it are
+    reported under file_path.
+    """
+    tool = command[0]
+    fd = os.memfd_create(os.path.basename(file_path))
+    memory_path = f"/proc/self/fd/{fd}"
+    try:
+        with open(fd, "wb", closefd=False) as f:
+            f.write(content)
+        result = subprocess.run(command + MEMFD_ARGS.get(tool, []) + [memory_path], pass_fds=(fd,),
+                                capture_output=True, timeout=timeout)
+    finally:
+        os.close(fd)
+    findings = parse_findings(tool, result.stdout.decode("utf-8", errors="replace"),
+                              result.stderr.decode("utf-8", errors="replace"), [memory_path])
+    return [finding._replace(file=file_path) if finding.file == memory_path else finding for finding in findings]
+
+def lint_file_group(extension, file_paths):
+    """
+    Lint files of one language in as few linter invocations as possible and return their findings:
+    one parallel run for tools in BATCH_FLAGS, otherwise one run per file on a thread pool.
+    """
+    command = STATIC_ANALYZERS[extension]
+    tool = command[0]
+    with stage_timer(f"analyze_project:{tool}"):
+        if tool in BATCH_FLAGS:
+            return run_static_analyzer(command, file_paths, timeout=PROJECT_LINT_TIMEOUT,
+                                       processes=PROJECT_LINT_JOBS if BATCH_FLAGS[tool] else 1,
+                                       batch_flags=BATCH_FLAGS[tool])
+
+        with ThreadPoolExecutor(max_workers=PROJECT_LINT_JOBS) as pool:
+            results = pool.map(lambda path: run_static_analyzer(command, [path]), file_paths)
+            return [finding for findings in results for finding in findings]
+
+def analyze_text_file(file_path, progress=report_progress, deadline=None):
+    """
+    Analyze and summarize the content of .doc, .txt, and .pdf files using BART.
+    The text is streamed page by page (or paragraph by paragraph) into the summarizer,
+    within the DOCUMENT_MAX_PAGES / DOCUMENT_MAX_BYTES budget.
+    Without the model, or when it cannot answer by deadline, the summary is extractive.
+    """
+    try:
+        if not file_path.endswith(TEXT_DOCUMENT_TYPES):
             return "Unsupported text file type for analysis."
 
         # Dynamically wrap lines to a specified width
@@ -159,102 +640,566 @@ def analyze_text_file(file_path):
             import textwrap
             return "\n".join(textwrap.wrap(text, width))
 
-        # Wrap the extracted content
-        wrapped_content = wrap_text(content)
+        # Extract content lazily based on file type
+        document = DocumentText(file_path, max_pages=DOCUMENT_MAX_PAGES, max_bytes=DOCUMENT_MAX_BYTES)
 
-        # Use BART for summarization
-        if CODE_INTERPRETER is None:
-            return "Summarization model not available for text file analysis."
+        # Use BART for summarization (a chunk pass and a final pass)
+        summary = None
+        if use_abstractive_summary(deadline, calls=2):
+            tokenizer = summary_tokenizer()
+            try:
+                summary, _chunk_count, truncated = summarize_long_text(
+                    document,
+                    SUMMARIZER,
+                    tokenizer,
+                    max_chunk_tokens=min(SUMMARY_CHUNK_TOKENS, tokenizer.model_max_length - 2),
+                    max_chunks=SUMMARY_MAX_CHUNKS,
+                    chunk_kwargs={"max_length": 150, "min_length": 30, "do_sample": False},
+                    summary_kwargs={"max_length": 300, "min_length": 50, "do_sample": False},  # Adjust summary length as needed
+                    progress=progress,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                fall_back_to_extractive(e)
+                # Read the document again from the start
+                document = DocumentText(file_path, max_pages=DOCUMENT_MAX_PAGES, max_bytes=DOCUMENT_MAX_BYTES)
 
-        summary = CODE_INTERPRETER(
-            wrapped_content, 
-            max_length=300,  # Adjust summary length as needed
-            min_length=50, 
-            do_sample=False
-        )
+        if summary is None:
+            summary = " ".join(extract_sentences(split_sentences(document), EXTRACTIVE_SUMMARY_SENTENCES))
+            truncated = False
+        if not summary:
+            return "No text found in the document."
 
         # Wrap the summary text
-        final_summary = wrap_text(summary[0]['summary_text'])
+        final_summary = wrap_text(summary)
+        if truncated or document.truncated:
+            final_summary += "\n\n(Document too long: only its beginning was summarized.)"
         return final_summary  # Keep line breaks (\n) for plain-text rendering
 
     except Exception as e:
         return f"Error during text file analysis: {str(e)}"
 
-def categorize_static_analysis(static_analysis_result):
+def categorize_static_analysis(findings, tool):
     """
-    Categorize static analysis results into Readability, Code Quality, and Error categories.
+    Categorize findings reported by tool into Readability, Code Quality, and Error categories
+    by rule ID, falling back to keywords in the rule and message (see TAXONOMY_FILE).
     """
-    categories = {"Readability": [], "Code Quality": [], "Error": []}
-
-    for line in static_analysis_result.split("\n"):
-        # Lowercase the line for easier matching
-        lower_line = line.lower()
+    return TAXONOMY.categorize(findings, tool)
 
-        # Check categories
-        if "line too long" in lower_line or "readable" in lower_line:
-            categories["Readability"].append(line)
-        elif "unused" in lower_line or "redundant" in lower_line or "code quality" in lower_line:
-            categories["Code Quality"].append(line)
-        elif "error" in lower_line or "undefined" in lower_line:
-            categories["Error"].append(line)
-
-    return categories
+def format_categories(categorized_results):
+    """
+    Categorized findings as lines of text, for JSON responses.
+    """
+    return {category: [format_finding(finding) for finding in findings]
+            for category, findings in categorized_results.items()}
 
 @app.route("/")
 def home():
     return render_template("index.html")
 
-@app.route("/upload", methods=["POST"])
-def upload_file():
+CODE_EXTENSIONS = [".py", ".js", ".cpp", ".html"]
+TEXT_EXTENSIONS = list(TEXT_DOCUMENT_TYPES)
+
+
+def format_code_analysis_result(llm_summary, categorized_results, findings):
     """
-    File upload and analysis logic.
+    Combine the summary, categorized findings and all findings into the response text.
+    """
+    return f"""Static Analysis Results Summary:\n{llm_summary}\n\n
+            Categorized Static Analysis Results:\n
+            - Readability Issues:\n{format_findings(categorized_results['Readability'])}\n\n
+            - Code Quality Issues:\n{format_findings(categorized_results['Code Quality'])}\n\n
+            - Errors:\n{format_findings(categorized_results['Error'])}\n\n
+            Full Static Analysis Results:\n{format_findings(findings)}
+            """
+
+
+def run_analysis(file_path, extension, source_name=None, content=None, deadline=None):
+    """
+    Run the analysis pipeline for a saved upload, or for a code upload held in memory (content).
+    The summary is extractive when the model cannot give it by deadline (time.monotonic()).
+    Returns the formatted result text plus its parts (summary, categorized findings,
+    all findings as text and as records) so the page can render them separately.
+    Executed by the job queue workers.
+    """
+    start_timings()
+    try:
+        if extension in CODE_EXTENSIONS:
+            # Static code analysis
+            findings = analyze_code(file_path, source_name, content)
+            with stage_timer("categorize"):
+                categorized_results = categorize_static_analysis(findings, STATIC_ANALYZERS[extension][0])
+            with stage_timer("summarize"):
+                llm_summary = llm_static_analysis_summary(findings, deadline)
+
+            # Combine results with better formatting
+            with stage_timer("build_response"):
+                result = format_code_analysis_result(llm_summary, categorized_results, findings)
+                return {
+                    "result": result.replace("\n", "<br>"),  # For browser-friendly newlines
+                    "summary": llm_summary,
+                    "categories": format_categories(categorized_results),
+                    "raw": format_findings(findings),
+                    "findings": [finding._asdict() for finding in findings],
+                }
+
+        # Text file analysis
+        with stage_timer("summarize"):
+            text_summary = analyze_text_file(file_path, deadline=deadline)
+        result = f"Text File Analysis Summary:\n{text_summary}"
+        return {"result": result.replace("\n", "<br>"), "summary": text_summary}
+    finally:
+        # Stage timings are returned with the job status in a Server-Timing header
+        report_timings(stop_timings())
+
+
+def run_project_analysis(project_dir, files, skipped, deadline=None):
+    """
+    Run the analysis pipeline over the files of a multi-file or archive upload.
+    Returns an aggregate report (summary, categorized findings, all findings as text and
+    as records) plus the categorized findings of each file.
+    Executed by the job queue workers.
+    """
+    start_timings()
+    try:
+        groups = group_by_extension([os.path.join(project_dir, name) for name in files])
+        tool_findings = []  # (tool, its findings) per extension, as rule IDs are categorized per tool
+        for done, (extension, file_paths) in enumerate(groups.items()):
+            report_progress(done, len(groups))
+            tool = STATIC_ANALYZERS[extension][0]
+            try:
+                tool_findings.append((tool, lint_file_group(extension, file_paths)))
+            except subprocess.TimeoutExpired:
+                tool_findings.append((tool, [analysis_error(None, f"{tool} analysis timed out")]))
+            except Exception as e:
+                tool_findings.append((tool, [analysis_error(None, f"Error during static analysis: {str(e)}")]))
+        report_progress(len(groups), len(groups))
+
+        # Report paths relative to the project
+        prefix = project_dir + os.sep
+        tool_findings = [
+            (tool, [
+                finding._replace(file=finding.file[len(prefix):])
+                if finding.file and finding.file.startswith(prefix) else finding
+                for finding in found
+            ])
+            for tool, found in tool_findings
+        ]
+        findings = [finding for _tool, found in tool_findings for finding in found]
+
+        with stage_timer("categorize"):
+            categorized_results = {category: [] for category in CATEGORIES}
+            for tool, found in tool_findings:
+                for category, category_findings in categorize_static_analysis(found, tool).items():
+                    categorized_results[category].extend(category_findings)
+            file_categories = {name: {category: [] for category in categorized_results} for name in files}
+            for category, category_findings in categorized_results.items():
+                for finding in category_findings:
+                    if finding.file in file_categories:
+                        file_categories[finding.file][category].append(format_finding(finding))
+            file_reports = [{"path": name, "categories": file_categories[name]} for name in files]
+        with stage_timer("summarize"):
+            llm_summary = llm_static_analysis_summary(findings, deadline)
+
+        with stage_timer("build_response"):
+            result = format_code_analysis_result(llm_summary, categorized_results, findings)
+            result += "\nPer-file Results:\n" + "\n".join(
+                f"{report['path']}: " + ", ".join(
+                    f"{len(file_findings)} {category}" for category, file_findings in report["categories"].items())
+                for report in file_reports
+            )
+            if skipped:
+                result += f"\n\nSkipped (unsupported or unsafe names): {', '.join(skipped)}"
+            return {
+                "result": result.replace("\n", "<br>"),  # For browser-friendly newlines
+                "summary": llm_summary,
+                "categories": format_categories(categorized_results),
+                "raw": format_findings(findings),
+                "findings": [finding._asdict() for finding in findings],
+                "files": file_reports,
+                "skipped": skipped,
+            }
+    finally:
+        report_timings(stop_timings())
+
+
+def run_fast_analysis(file_path, content=None):
+    """
+    Analyze a Python upload with the in-process fast_analyzer rules only:
+    no linter subprocess and no summary, so it runs within the request.
+    """
+    with stage_timer("analyze_code:fast"):
+        if content is None:
+            findings = analyze_python_fast(file_path)
+        else:
+            findings = analyze_python_source_fast(content.decode("utf-8", errors="replace"), file_path)
+    with stage_timer("categorize"):
+        categorized_results = categorize_static_analysis(findings, "fast_analyzer")
+    summary = f"Fast analysis found {len(findings)} issues. Linters and the summary are skipped in fast mode."
+
+    with stage_timer("build_response"):
+        result = format_code_analysis_result(summary, categorized_results, findings)
+        return {
+            "status": "finished",
+            "mode": "fast",
+            "result": result.replace("\n", "<br>"),  # For browser-friendly newlines
+            "summary": summary,
+            "categories": format_categories(categorized_results),
+            "raw": format_findings(findings),
+            "findings": [finding._asdict() for finding in findings],
+        }
+
+
+def is_project_upload():
+    """
+    Whether the current request uploads several files or an archive.
+    """
+    files = request.files.getlist("file")
+    return len(files) > 1 or (len(files) == 1 and archive_extension(files[0].filename) is not None)
+
+
+def save_project_upload():
+    """
+    Save the files of a multi-file or archive upload into a folder of their own,
+    within the PROJECT_MAX_FILES / PROJECT_MAX_BYTES limits.
+    Returns (project folder, ProjectWriter, None), or (None, None, error response) when it is rejected.
+    The folder is in use in UPLOAD_STORE until released.
+    """
+    project_dir = UPLOAD_STORE.new_project()
+    writer = ProjectWriter(project_dir, CODE_EXTENSIONS, PROJECT_MAX_FILES, PROJECT_MAX_BYTES)
+    try:
+        with stage_timer("save"):
+            for file in request.files.getlist("file"):
+                if archive_extension(file.filename):
+                    writer.add_archive(file.filename, file.stream)
+                else:
+                    writer.add(file.filename, file.stream)
+    except (ProjectLimitError, zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+        shutil.rmtree(project_dir, ignore_errors=True)
+        UPLOAD_STORE.release(project_dir)
+        return None, None, jsonify({"error": f"Upload rejected: {str(e)}"})
+
+    if not writer.files:
+        shutil.rmtree(project_dir, ignore_errors=True)
+        UPLOAD_STORE.release(project_dir)
+        return None, None, jsonify({"error": "No supported code files found in the upload."})
+    return project_dir, writer, None
+
+
+def save_uploaded_file():
+    """
+    Validate and save the file in the current request.
+    Returns (file_path, extension, content, None), or (None, None, None, error response) when it is rejected.
+    Code files up to MEMORY_ANALYSIS_MAX_BYTES are kept in memory: content holds their bytes and
+    file_path only names them (a copy is stored when PERSIST_UPLOADS is set). Other files are
+    saved, content is None, and the file is in use in UPLOAD_STORE until released.
     """
     if "file" not in request.files:
-        return jsonify({"error": "No file part in the request."})
+        return None, None, None, jsonify({"error": "No file part in the request."})
 
     file = request.files["file"]
     if file.filename == "":
-        return jsonify({"error": "No file selected."})
+        return None, None, None, jsonify({"error": "No file selected."})
 
-    # Save the uploaded file
     filename = secure_filename(file.filename)
-    name, extension = os.path.splitext(filename)
-    unique_filename = f"{name}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}{extension}"
-    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-    file.save(file_path)
+    extension = os.path.splitext(filename)[1]
+    if extension not in CODE_EXTENSIONS + TEXT_EXTENSIONS:
+        return None, None, None, jsonify({"error": "Unsupported file type for analysis."})
+
+    with stage_timer("save"):
+        tool = STATIC_ANALYZERS.get(extension, [None])[0]
+        if tool in STDIN_ARGS or (tool is not None and hasattr(os, "memfd_create")):
+            content = file.stream.read(MEMORY_ANALYSIS_MAX_BYTES + 1)
+            if len(content) <= MEMORY_ANALYSIS_MAX_BYTES:
+                if PERSIST_UPLOADS:
+                    UPLOAD_STORE.release(UPLOAD_STORE.save(io.BytesIO(content), extension))
+                return os.path.join(MEMORY_UPLOAD_FOLDER, filename), extension, content, None
+            file.stream.seek(0)
+
+        # Save the uploaded file (a file already stored with the same content is reused)
+        file_path = UPLOAD_STORE.save(file.stream, extension)
+    return file_path, extension, None, None
 
+
+def run_upload_job(upload_path, func, *args):
+    """
+    Run an analysis job, then release its upload in UPLOAD_STORE so retention may remove it.
+    """
     try:
-        if extension in [".py", ".js", ".cpp", ".html"]:
-            # Static code analysis
-            static_analysis_result = analyze_code(file_path)
-            categorized_results = categorize_static_analysis(static_analysis_result)
-            llm_summary = llm_static_analysis_summary(static_analysis_result)
+        return func(*args)
+    finally:
+        UPLOAD_STORE.release(upload_path)
 
-            # Combine results with better formatting
-            result = f"""Static Analysis Results Summary:\n{llm_summary}\n\n
-            Categorized Static Analysis Results:\n
-            - Readability Issues:\n{'\n'.join(categorized_results['Readability'])}\n\n
-            - Code Quality Issues:\n{'\n'.join(categorized_results['Code Quality'])}\n\n
-            - Errors:\n{'\n'.join(categorized_results['Error'])}\n\n
-            Full Static Analysis Results:\n{static_analysis_result}
-            """
 
-        elif extension in [".txt", ".docx", ".pdf"]:
-            # Text file analysis
-            text_summary = analyze_text_file(file_path)
-            result = f"Text File Analysis Summary:\n{text_summary}"
+def sse_event(event, data):
+    """
+    Format one Server-Sent Event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
+def stream_analysis(file_path, extension, source_name=None, content=None, deadline=None):
+    """
+    Yield analysis results as Server-Sent Events as each stage completes:
+    - findings: categorized findings and all findings (as text and records), as soon as the linter returns
+    - summary_chunk: pieces of the summary as they are generated
+    - progress: chunks summarized so far (text documents)
+    - done, or error if a stage fails
+    """
+    try:
+        if extension in CODE_EXTENSIONS:
+            findings = analyze_code(file_path, source_name, content)
+            with stage_timer("categorize"):
+                categorized_results = categorize_static_analysis(findings, STATIC_ANALYZERS[extension][0])
+            yield sse_event("findings", {
+                "categories": format_categories(categorized_results),
+                "raw": format_findings(findings),
+                "findings": [finding._asdict() for finding in findings],
+            })
+
+            with stage_timer("summarize"):
+                for piece in stream_static_analysis_summary(findings, deadline):
+                    yield sse_event("summary_chunk", {"text": piece})
         else:
-            return jsonify({"error": "Unsupported file type for analysis."})
+            # Summarize on a helper thread so progress can be sent while it runs
+            events = queue.Queue()
+
+            def summarize_document():
+                try:
+                    summary = analyze_text_file(
+                        file_path,
+                        progress=lambda done, total: events.put(("progress", {"done": done, "total": total})),
+                        deadline=deadline,
+                    )
+                    events.put(("summary_chunk", {"text": summary}))
+                finally:
+                    events.put(None)
 
-        # Format the JSON response with indentation for readability
-        return jsonify({"result": result.replace("\n", "<br>")})  # For browser-friendly newlines
+            threading.Thread(target=summarize_document, name="document-stream", daemon=True).start()
+            for event in iter(events.get, None):
+                yield sse_event(*event)
 
+        yield sse_event("done", {})
     except Exception as e:
-        return jsonify({"error": f"Analysis failed: {str(e)}"})
+        yield sse_event("error", {"error": f"Analysis failed: {str(e)}"})
+
+
+@app.route("/upload/stream", methods=["POST"])
+def upload_file_stream():
+    """
+    Streaming variant of /upload: analyzes the file within the request and sends
+    each stage's results as Server-Sent Events as soon as they are available.
+    """
+    if is_project_upload():
+        return jsonify({"error": "Multi-file and archive uploads are analyzed through /upload."})
+
+    file_path, extension, content, error = save_uploaded_file()
+    if error is not None:
+        return error
+    if extension in CODE_EXTENSIONS and not LINTER_EXECUTOR.accepting():
+        UPLOAD_STORE.release(file_path)
+        return busy_response("linter queue is full")
+
+    # The generator runs after the request context is gone, so read the name and budget now
+    source_name = secure_filename(request.files["file"].filename)
+    deadline = request_deadline()
+
+    def events():
+        try:
+            yield from stream_analysis(file_path, extension, source_name, content, deadline)
+        finally:
+            UPLOAD_STORE.release(file_path)
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def busy_response(reason):
+    """
+    429 response asking the client to retry after JOB_RETRY_AFTER seconds.
+    """
+    response = jsonify({"error": f"Server is busy: {reason}"})
+    response.headers["Retry-After"] = str(JOB_RETRY_AFTER)
+    return response, 429
+
+
+@app.route("/upload", methods=["POST"])
+def upload_file():
+    """
+    Save the uploaded file (or files, or archive) and queue it for analysis.
+    Responds with a job ID to poll at /jobs/<job_id>, or with the result right away
+    for a Python file uploaded with mode=fast.
+    """
+    deadline = request_deadline()
+    if is_project_upload():
+        project_dir, writer, error = save_project_upload()
+        if error is not None:
+            return error
+        upload_path = project_dir
+        job = (run_project_analysis, project_dir, writer.files, writer.skipped, deadline)
+    else:
+        file_path, extension, content, error = save_uploaded_file()
+        if error is not None:
+            return error
+        if extension == ".py" and request.values.get("mode") == "fast":
+            return jsonify(run_upload_job(file_path, run_fast_analysis, file_path, content))
+        upload_path = file_path
+        job = (run_analysis, file_path, extension, secure_filename(request.files["file"].filename), content, deadline)
+
+    # Jobs lint on the JOB_WORKERS threads, so they never fill the linter queue:
+    # backpressure for /upload is the job queue (JOB_QUEUE_SIZE)
+    try:
+        job_id = JOB_QUEUE.submit(run_upload_job, upload_path, *job)
+    except QueueFull as e:
+        UPLOAD_STORE.release(upload_path)
+        return busy_response(str(e))
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for("job_status", job_id=job_id),
+    }), 202
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """
+    Report the status of an analysis job, with its result once finished.
+    """
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job ID."}), 404
+
+    response = {"job_id": job_id, "status": job["status"], "progress": job["progress"]}
+    if job["status"] == "finished":
+        response.update(job["result"])
+    elif job["status"] == "failed":
+        response["error"] = f"Analysis failed: {job['error']}"
+
+    # The job's own durations are prefixed, so they are not read as parts of this poll's total
+    if job["started"] is not None:
+        add_timing("job_queue", job["started"] - job["created"])
+    for stage, seconds in job["timings"] or []:
+        add_timing(f"job_{stage}", seconds)
+    with stage_timer("serialize"):
+        return jsonify(response)
+
+
+@app.route("/status")
+def service_status():
+    """
+    Report job queue depth, cache and upload store statistics.
+    """
+    return jsonify({
+        "jobs": JOB_QUEUE.stats(),
+        "analysis_cache": ANALYSIS_CACHE.stats(),
+        "summary_cache": SUMMARY_CACHE.stats(),
+        "version_cache": VERSION_CACHE.stats(),
+        "upload_store": UPLOAD_STORE.stats(),
+        "linters": LINTER_EXECUTOR.stats(),
+        "pylint_engine": PYLINT_ENGINE.stats() if PYLINT_ENGINE is not None else None,
+        "summarizer": SUMMARIZER.stats(),
+    })
+
+
+@app.route("/metrics")
+def metrics():
+    """
+    Expose request, stage, queue, cache and model metrics in the Prometheus text format.
+    """
+    jobs = JOB_QUEUE.stats()
+    JOBS_IN_FLIGHT.set(jobs["queue_depth"], state="queued")
+    JOBS_IN_FLIGHT.set(jobs["running"], state="running")
+    for name, cache in (("analysis", ANALYSIS_CACHE), ("summary", SUMMARY_CACHE), ("version", VERSION_CACHE)):
+        stats = cache.stats()
+        for result in ("memory_hits", "disk_hits", "misses"):
+            CACHE_LOOKUPS.set(stats[result], cache=name, result=result)
+    linters = LINTER_EXECUTOR.stats()
+    LINTER_LIMIT.set(linters["max_processes"], tool="all")
+    for tool, limit in linters["tool_limits"].items():
+        LINTER_LIMIT.set(min(limit, linters["max_processes"]), tool=tool)
+    for tool in sorted({command[0] for command in STATIC_ANALYZERS.values()}):
+        LINTER_PROCESSES.set(linters["running"].get(tool, 0), tool=tool, state="running")
+        LINTER_PROCESSES.set(linters["waiting"].get(tool, 0), tool=tool, state="waiting")
+        LINTER_BUSY_SECONDS.set(linters["busy_seconds"].get(tool, 0), tool=tool)
+        LINTER_WAIT_SECONDS.set(linters["wait_seconds"].get(tool, 0), tool=tool)
+    LINTER_REJECTED.set(linters["rejected"])
+    LINTER_UTILIZATION.set(linters["utilization"])
+    uploads = UPLOAD_STORE.stats()
+    UPLOADS_STORED.set(uploads["saved"], result="new")
+    UPLOADS_STORED.set(uploads["deduplicated"], result="deduplicated")
+    UPLOAD_RECLAIMED_BYTES.set(uploads["reclaimed_bytes"])
+    summarizer = SUMMARIZER.stats()
+    for size, count in summarizer["batch_sizes"].items():
+        SUMMARY_BATCHES.set(count, size=size)
+    for stat, milliseconds in summarizer["queue_wait_ms"].items():
+        SUMMARY_QUEUE_WAIT.set(milliseconds / 1000, stat=stat)
+    SUMMARY_ESTIMATE.set(SUMMARIZER.estimate_seconds() or 0)
+    MODEL_LOAD_SECONDS.set(MODEL_STATE["load_seconds"] or 0)
+    MODEL_READY.set(1 if MODEL_STATE["status"] == "ready" else 0)
+    return REGISTRY.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.before_request
+def start_request_timing():
+    REQUESTS_IN_FLIGHT.inc()
+    g.request_started = time.perf_counter()
+    start_timings()
+
+
+@app.after_request
+def add_server_timing(response):
+    """
+    Record request metrics and report stage timings in a Server-Timing header.
+    """
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or "unknown"
+    REQUESTS_TOTAL.inc(endpoint=endpoint, status=response.status_code)
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    timings = stop_timings()
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings + [("total", elapsed)])
+    return response
+
+
+@app.teardown_request
+def finish_request_timing(_error):
+    REQUESTS_IN_FLIGHT.dec()
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(_error):
+    return jsonify({"error": f"Upload rejected: larger than {app.config['MAX_CONTENT_LENGTH']} bytes."}), 413
+
+
+@app.route("/healthz")
+def healthz():
+    """
+    Liveness check: the web tier is up, whatever the model state.
+    """
+    return jsonify({"status": "ok", "model": MODEL_STATE})
+
+
+@app.route("/readyz")
+def readyz():
+    """
+    Readiness check: 503 while the summarization model is still loading.
+    """
+    ready = MODEL_STATE["status"] not in ("not_loaded", "loading") or not SUMMARIZER_WARMUP
+    return jsonify({"ready": ready, "model": MODEL_STATE}), 200 if ready else 503
+
+
+# WSGI servers import this module: start loading the model as soon as the app is created
+if SUMMARIZER_WARMUP and not SUMMARIZER_PRELOAD and __name__ != "__main__":
+    start_model_warmup()
 
 
+# Development server with the debug reloader; use serve.py in production
 if __name__ == "__main__":
-    # Initialize the LLaMA-2 model
-    initialize_code_interpreter()
+    # The debug reloader runs this file again in a child process; only the child serves requests
+    if SUMMARIZER_WARMUP and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_model_warmup()
     app.run(debug=True)
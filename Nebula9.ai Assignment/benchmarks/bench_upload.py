@@ -0,0 +1,235 @@
+"""
+End-to-end benchmark for /upload.
+
+Drives the analysis pipeline with the distinct files in upload/ plus synthetic
+scaled-up copies of them (the file repeated --scales times), and times:
+- each stage on its own: file save (save_uploaded_file, as /upload runs it), analyze_code per tool, categorize_static_analysis,
+  preprocess_static_analysis, summarization, response building and JSON serialization;
+- the whole request through the Flask test client (POST /upload, then polling /jobs/<id>),
+  or through a live server with --url.
+
+Results (p50/p95/p99 per stage, in milliseconds) are written as JSON. With --baseline,
+each stage's p95 is compared against a stored run and the script exits with status 1
+when any stage is slower than the baseline by more than --threshold.
+
+Usage:
+  python benchmarks/bench_upload.py --output results.json
+  python benchmarks/bench_upload.py --baseline baseline.json --threshold 1.25
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# Absolute slack added to the baseline p95 before comparing, so sub-millisecond stages do not flap
+BASELINE_SLACK_MS = 5.0
+
+
+def percentile(values, fraction):
+    """
+    Linearly interpolated percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_timings(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": max(samples),
+    }
+
+
+def load_inputs(app, scales):
+    """
+    Return (name, extension, bytes) for each distinct upload/ file at each scale factor.
+    """
+    from result_cache import file_digest
+
+    upload_dir = os.path.join(APP_DIR, "upload")
+    seen, inputs = set(), []
+    for name in sorted(os.listdir(upload_dir)):
+        path = os.path.join(upload_dir, name)
+        extension = os.path.splitext(name)[1]
+        if extension not in app.CODE_EXTENSIONS + app.TEXT_EXTENSIONS or not os.path.getsize(path):
+            continue
+        digest = file_digest(path)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        with open(path, "rb") as f:
+            content = f.read()
+        for scale in scales:
+            inputs.append((f"{os.path.splitext(name)[0]}_x{scale}{extension}", extension, content * scale))
+    return inputs
+
+
+def timed(samples, stage, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(stage, []).append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def run_stages(app, inputs, repeat, samples):
+    """
+    Time each pipeline stage separately by calling the app's functions directly.
+    """
+    for _ in range(repeat):
+        for name, extension, content in inputs:
+            # The upload path of /upload: small code files are kept in memory and linted from it,
+            # other files are streamed to the upload store
+            with app.app.test_request_context("/upload", method="POST", data={"file": (io.BytesIO(content), name)}):
+                file_path, extension, memory_content, _error = timed(samples, "save", app.save_uploaded_file)
+            try:
+                if extension in app.CODE_EXTENSIONS:
+                    tool = app.STATIC_ANALYZERS[extension][0]
+                    findings = timed(samples, f"analyze_code:{tool}", app.analyze_code, file_path, name, memory_content)
+                    categorized = timed(samples, "categorize", app.categorize_static_analysis, findings, tool)
+                    timed(samples, "preprocess", app.preprocess_static_analysis, findings)
+                    summary = timed(samples, "summarize", app.llm_static_analysis_summary, findings)
+                    result = timed(samples, "build_response", app.format_code_analysis_result,
+                                   summary, categorized, findings)
+                else:
+                    result = timed(samples, "summarize", app.analyze_text_file, file_path)
+                timed(samples, "serialize", json.dumps, {"result": result.replace("\n", "<br>")})
+            finally:
+                app.UPLOAD_STORE.release(file_path)
+
+
+def multipart_body(name, content):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def run_end_to_end(app, inputs, repeat, samples, url=None, poll_interval=0.05):
+    """
+    Time complete requests: POST /upload, then poll the job until it finishes.
+    """
+    if url is None:
+        client = app.app.test_client()
+
+        def post(name, content):
+            return client.post("/upload", data={"file": (io.BytesIO(content), name)}).get_json()
+
+        def get(path):
+            return client.get(path).get_json()
+    else:
+        def post(name, content):
+            body, content_type = multipart_body(name, content)
+            request = urllib.request.Request(f"{url}/upload", data=body, headers={"Content-Type": content_type})
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)
+
+        def get(path):
+            with urllib.request.urlopen(f"{url}{path}") as response:
+                return json.load(response)
+
+    for _ in range(repeat):
+        for name, extension, content in inputs:
+            started = time.perf_counter()
+            job = post(name, content)
+            while job.get("status") in ("queued", "running"):
+                time.sleep(poll_interval)
+                job = get(f"/jobs/{job['job_id']}")
+            if job.get("status") != "finished":
+                print(f"{name}: {job.get('error', job)}")
+                continue
+            samples.setdefault("end_to_end", []).append((time.perf_counter() - started) * 1000)
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Return the stages whose p95 exceeds threshold times the baseline p95 (plus BASELINE_SLACK_MS).
+    """
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * threshold + BASELINE_SLACK_MS:
+            regressions.append(f"{stage}: p95 {current['p95_ms']:.1f} ms vs baseline {previous['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /upload over the upload/ corpus.")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the inputs")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4], help="synthetic size multipliers")
+    parser.add_argument("--cache", action="store_true", help="keep the analysis, summary and incremental caches enabled")
+    parser.add_argument("--with-model", action="store_true", help="load the summarization model first")
+    parser.add_argument("--url", help="benchmark a live server (e.g. http://127.0.0.1:5000) end to end")
+    parser.add_argument("--skip-stages", action="store_true", help="only run the end-to-end requests")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed p95 slowdown factor")
+    args = parser.parse_args()
+
+    os.environ["SUMMARIZER_WARMUP"] = "0"
+    os.chdir(APP_DIR)  # app.py resolves upload/ and cache/ relative to the working directory
+    import app
+
+    if not args.cache:
+        # Measure the cold path: every lookup misses, and no file is analyzed against an earlier version
+        app.ANALYSIS_CACHE.get = lambda key: None
+        app.SUMMARY_CACHE.get = lambda key: None
+        app.INCREMENTAL_ANALYSIS = False
+    if args.with_model:
+        app.initialize_code_interpreter()
+
+    inputs = load_inputs(app, args.scales)
+    samples = {}
+    if not args.skip_stages:
+        run_stages(app, inputs, args.repeat, samples)
+    run_end_to_end(app, inputs, args.repeat, samples, url=args.url)
+
+    results = {
+        "meta": {
+            "inputs": [name for name, _extension, _content in inputs],
+            "repeat": args.repeat,
+            "cache": args.cache,
+            "model": app.MODEL_STATE["status"],
+            "url": args.url,
+        },
+        "stages": {stage: summarize_timings(values) for stage, values in samples.items()},
+    }
+
+    print(f"{'stage':<24} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, timing in results["stages"].items():
+        print(f"{stage:<24} {timing['count']:>4} {timing['p50_ms']:9.1f} {timing['p95_ms']:9.1f} {timing['p99_ms']:9.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+        print(f"No stage slower than {args.threshold:.2f}x the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
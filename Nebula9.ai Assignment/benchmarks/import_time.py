@@ -0,0 +1,102 @@
+"""
+Import-time benchmark for app.py.
+
+Imports the app in a fresh interpreter (with model warm-up disabled) several times,
+reports the fastest wall-clock time and the slowest modules from -X importtime,
+and exits with status 1 when the import exceeds --max-seconds or pulls in
+one of the heavy ML modules that must stay lazily imported.
+
+Usage: python benchmarks/import_time.py [--runs 5] [--max-seconds 1.5]
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that app.py must only import when the model is loaded
+LAZY_MODULES = ["torch", "transformers", "PyPDF2", "docx"]
+
+
+def measure_import():
+    """
+    Import app.py in a new interpreter and return (seconds, -X importtime report lines).
+    """
+    env = dict(os.environ, SUMMARIZER_WARMUP="0")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app.py failed:\n{result.stderr}")
+    return elapsed, [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+
+
+def parse_importtime(lines):
+    """
+    Return (module, cumulative microseconds) pairs from -X importtime output.
+    Nested imports keep their indentation in the module name.
+    """
+    modules = []
+    for line in lines[1:]:  # First line is the header
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name[1:].rstrip(), int(cumulative_us)))
+    return modules
+
+
+def app_imports(modules):
+    """
+    Return the modules imported directly by app.py.
+    importtime lists children (indented two spaces per level) before their parent.
+    """
+    pending = []
+    for name, us in modules:
+        if not name.startswith(" "):
+            if name == "app":
+                return pending
+            pending = []
+        elif name[2] != " ":
+            pending.append((name.strip(), us))
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long importing app.py takes.")
+    parser.add_argument("--runs", type=int, default=5, help="number of imports to time")
+    parser.add_argument("--max-seconds", type=float, default=1.5, help="fail above this import time")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules to list")
+    args = parser.parse_args()
+
+    timings = []
+    report = []
+    for _ in range(args.runs):
+        elapsed, report = measure_import()
+        timings.append(elapsed)
+
+    best = min(timings)
+    modules = parse_importtime(report)
+    print(f"app.py import: best {best:.3f}s, median {sorted(timings)[len(timings) // 2]:.3f}s over {args.runs} runs")
+    print("Slowest imports made by app.py (cumulative):")
+    direct = app_imports(modules)
+    for name, us in sorted(direct, key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    imported = {name.strip().split(".")[0] for name, _us in modules}
+    for module in LAZY_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at module level")
+    if best > args.max_seconds:
+        failures.append(f"import took {best:.3f}s (limit {args.max_seconds:.3f}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
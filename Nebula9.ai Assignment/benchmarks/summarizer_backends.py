@@ -0,0 +1,176 @@
+"""
+Summarizer backend benchmark.
+
+Builds summarizer inputs from the bundled upload/ corpus the same way the app does
+(analyze_code followed by preprocess_static_analysis), then loads each inference
+backend in its own process and reports:
+- model load time and per-summary latency (mean / p95),
+- peak resident memory,
+- ROUGE-L F1 of each summary against the fp32 output.
+
+Usage: python benchmarks/summarizer_backends.py [--backends fp32 int8 bf16] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# Same generation parameters as llm_static_analysis_summary
+GENERATION_KWARGS = {"max_length": 150, "min_length": 30, "do_sample": False}
+
+
+def build_corpus():
+    """
+    Return the distinct preprocessed static analysis texts for the files in upload/.
+    """
+    os.environ["SUMMARIZER_WARMUP"] = "0"
+    os.chdir(APP_DIR)  # app.py resolves upload/ and cache/ relative to the working directory
+    import app
+    from result_cache import file_digest
+
+    upload_dir = os.path.join(APP_DIR, "upload")
+    seen, corpus = set(), []
+    for name in sorted(os.listdir(upload_dir)):
+        path = os.path.join(upload_dir, name)
+        if os.path.splitext(name)[1] not in app.STATIC_ANALYZERS:
+            continue
+        digest = file_digest(path)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        text = app.preprocess_static_analysis(app.analyze_code(path))
+        if text:
+            corpus.append({"file": name, "text": text})
+    return corpus
+
+
+def run_backend(backend, corpus_path):
+    """
+    Load one backend, summarize the corpus and print the measurements as JSON.
+    Runs in a child process so memory figures are not shared between backends.
+    """
+    from summarizer import load_summarization_pipeline
+
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    started = time.perf_counter()
+    pipeline, used_backend = load_summarization_pipeline("facebook/bart-large-cnn", backend)
+    load_seconds = time.perf_counter() - started
+
+    pipeline(corpus[0]["text"], truncation=True, **GENERATION_KWARGS)  # Warm-up call
+    summaries, latencies = [], []
+    for item in corpus:
+        started = time.perf_counter()
+        output = pipeline(item["text"], truncation=True, **GENERATION_KWARGS)
+        latencies.append(time.perf_counter() - started)
+        summaries.append(output[0]["summary_text"])
+
+    print(json.dumps({
+        "backend": used_backend,
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "summaries": summaries,
+    }))
+
+
+def rouge_l(reference, candidate):
+    """
+    ROUGE-L F1 between two texts, on lowercased whitespace tokens.
+    """
+    ref, cand = reference.lower().split(), candidate.lower().split()
+    if not ref or not cand:
+        return 0.0
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(cand) + 1)
+    for ref_token in ref:
+        current = [0]
+        for index, cand_token in enumerate(cand):
+            if ref_token == cand_token:
+                current.append(previous[index] + 1)
+            else:
+                current.append(max(previous[index + 1], current[index]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare summarizer inference backends.")
+    parser.add_argument("--backends", nargs="+", default=["fp32", "int8", "bf16"])
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--run-backend", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        run_backend(args.run_backend, args.corpus)
+        return 0
+
+    corpus = build_corpus()
+    if not corpus:
+        print("No static analysis output found for the files in upload/ (are the linters installed?)")
+        return 1
+    print(f"Corpus: {len(corpus)} distinct inputs from upload/")
+
+    backends = list(args.backends)
+    if "fp32" not in backends:
+        backends.insert(0, "fp32")  # Reference for the similarity score
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(corpus, f)
+        corpus_path = f.name
+
+    results = {}
+    try:
+        for backend in backends:
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-backend", backend, "--corpus", corpus_path],
+                capture_output=True, text=True,
+            )
+            if child.returncode != 0:
+                print(f"{backend}: failed\n{child.stderr}")
+                continue
+            results[backend] = json.loads(child.stdout.strip().splitlines()[-1])
+    finally:
+        os.remove(corpus_path)
+
+    reference = results.get("fp32")
+    print(f"{'backend':<8} {'used':<6} {'load s':>7} {'mean s':>7} {'p95 s':>7} {'RSS MB':>8} {'ROUGE-L':>8}")
+    for backend, result in results.items():
+        latencies = result["latencies"]
+        similarity = None
+        if reference is not None:
+            scores = [rouge_l(ref, cand) for ref, cand in zip(reference["summaries"], result["summaries"])]
+            similarity = sum(scores) / len(scores)
+        result["rouge_l_vs_fp32"] = similarity
+        print(
+            f"{backend:<8} {result['backend']:<6} {result['load_seconds']:7.2f} "
+            f"{sum(latencies) / len(latencies):7.2f} {percentile(latencies, 0.95):7.2f} "
+            f"{result['peak_rss_mb']:8.0f} {similarity if similarity is not None else float('nan'):8.3f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"corpus": [item["file"] for item in corpus], "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
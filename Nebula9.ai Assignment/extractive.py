@@ -0,0 +1,149 @@
+"""
+Extractive summaries: the sentences of a text (or lines of a findings digest) that best
+represent the rest, chosen with TextRank instead of generated by the model.
+
+Sentences are compared by the cosine similarity of their TF-IDF word vectors, and a
+sentence scores high when it is similar to many high-scoring sentences (PageRank over
+the similarity graph). Long texts are ranked GROUP_SIZE sentences at a time: the best
+sentences so far compete with the next group, so memory stays bounded.
+"""
+import re
+
+GROUP_SIZE = 256
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+MIN_WORDS = 4  # Shorter sentences (headings, page numbers) are only chosen when there are no others
+DUPLICATE_SIMILARITY = 0.9  # Sentences at least this similar to an earlier one are left out
+
+WORD = re.compile(r"[a-z][a-z0-9_']*")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+
+def sentence_words(sentence):
+    return [word for word in WORD.findall(sentence.lower()) if word not in STOP_WORDS]
+
+
+def split_sentences(blocks):
+    """
+    Yield the sentences of a text given as blocks (lines, paragraphs or pages).
+    Consecutive non-blank lines are joined first, so sentences wrapped over several lines
+    stay whole; a blank line, or the end of a block that is not a line, ends a paragraph.
+    """
+    paragraph = []
+    for block in blocks:
+        for line in block.splitlines():
+            line = line.strip()
+            if line:
+                paragraph.append(line)
+            elif paragraph:
+                yield from SENTENCE_END.split(" ".join(paragraph))
+                paragraph = []
+        if paragraph and not block.endswith("\n"):
+            yield from SENTENCE_END.split(" ".join(paragraph))
+            paragraph = []
+    if paragraph:
+        yield from SENTENCE_END.split(" ".join(paragraph))
+
+
+def textrank(sentences, prior=None):
+    """
+    TextRank score of each sentence, as a NumPy array.
+    prior (a weight per sentence) biases PageRank's random jumps, e.g. towards earlier sentences.
+    """
+    import numpy as np
+
+    vocabulary = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for word in sentence_words(sentence):
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    count = len(sentences)
+    jump = np.ones(count) if prior is None else np.asarray(prior, dtype=np.float64)
+    jump = jump / jump.sum()
+    if not vocabulary:
+        return jump
+
+    # TF-IDF rows scaled to unit length, so their dot products are cosine similarities
+    weights = np.zeros((count, len(vocabulary)), dtype=np.float32)
+    np.add.at(weights, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1)
+    frequency = np.count_nonzero(weights, axis=0)
+    weights *= (np.log((1 + count) / (1 + frequency)) + 1).astype(np.float32)
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    weights /= np.where(norms > 0, norms, 1)
+    similarity = weights @ weights.T
+    np.fill_diagonal(similarity, 0)
+
+    # Each sentence passes its score to similar sentences; one similar to none passes it by the prior
+    totals = similarity.sum(axis=1, keepdims=True)
+    transitions = np.divide(similarity, totals, out=np.zeros_like(similarity), where=totals > 0)
+    isolated = totals[:, 0] == 0
+    scores = jump
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * jump + DAMPING * (scores @ transitions + scores[isolated].sum() * jump)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def drop_duplicates(sentences):
+    """
+    The sentences without those that repeat an earlier one exactly or nearly (word sets with a
+    Jaccard similarity of at least DUPLICATE_SIMILARITY), in text order.
+    """
+    unique, seen = [], []
+    for sentence in sentences:
+        words = set(sentence_words(sentence)) or {sentence.strip().lower()}
+        if any(len(words & other) >= DUPLICATE_SIMILARITY * len(words | other) for other in seen):
+            continue
+        unique.append(sentence)
+        seen.append(words)
+    return unique
+
+
+def top_sentences(sentences, count, prior=None):
+    """
+    Indices of the count highest-scoring sentences, in text order.
+    """
+    import numpy as np
+
+    if len(sentences) <= count:
+        return list(range(len(sentences)))
+    best = np.argsort(-textrank(sentences, prior), kind="stable")[:count]
+    return sorted(best.tolist())
+
+
+def extract_sentences(sentences, count, group_size=GROUP_SIZE):
+    """
+    The count most representative sentences of an iterable of sentences, in text order,
+    without repeats. Sentences under MIN_WORDS words are only used when all are that short.
+    The input is consumed lazily, at most group_size sentences being ranked at a time.
+    """
+    count = max(1, min(count, group_size // 2))
+    pool, short = [], []
+    for sentence in sentences:
+        if not sentence.strip():
+            continue
+        if len(sentence.split()) < MIN_WORDS:
+            if not pool and len(short) < group_size:
+                short.append(sentence)
+            continue
+        pool.append(sentence)
+        if len(pool) >= group_size:
+            pool = drop_duplicates(pool)
+            if len(pool) >= group_size:
+                pool = [pool[index] for index in top_sentences(pool, count)]
+    pool = drop_duplicates(pool or short)
+    return [pool[index] for index in top_sentences(pool, count)]
@@ -0,0 +1,203 @@
+import ast
+
+from findings import Finding
+
+# Rules, registered with the decorators below:
+# node rules run on each AST node of their types, line rules on each source line,
+# finish rules once after the traversal (for checks that need the whole module)
+NODE_RULES = {}
+LINE_RULES = []
+FINISH_RULES = []
+
+MAX_LINE_LENGTH = 100
+MAX_FUNCTION_LINES = 50
+MAX_ARGUMENTS = 5
+
+
+def node_rule(*node_types):
+    """
+    Register a rule(node, analysis) called for every node of the given types.
+    """
+    def register(rule):
+        for node_type in node_types:
+            NODE_RULES.setdefault(node_type, []).append(rule)
+        return rule
+    return register
+
+
+def line_rule(rule):
+    """
+    Register a rule(line_number, line, analysis) called for every source line.
+    """
+    LINE_RULES.append(rule)
+    return rule
+
+
+def finish_rule(rule):
+    """
+    Register a rule(analysis) called once after the traversal.
+    """
+    FINISH_RULES.append(rule)
+    return rule
+
+
+class Analysis:
+    """
+    State shared by the rules while one file is analyzed.
+    Rules record findings with report() and may keep their own data in state.
+    """
+
+    def __init__(self, file_path, tree):
+        self.file_path = file_path
+        self.tree = tree
+        self.findings = []
+        self.state = {}
+
+    def report(self, line, column, rule, severity, message):
+        self.findings.append(Finding(self.file_path, line, column, rule, severity, message))
+
+
+def analyze_source(source, file_path):
+    """
+    Run every registered rule over Python source in one AST traversal and one line scan.
+    Returns findings in the same records as the external linters.
+    """
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except SyntaxError as e:
+        return [Finding(file_path, e.lineno or 0, e.offset or 0, "syntax-error", "error", f"Parsing failed: {e.msg}")]
+
+    analysis = Analysis(file_path, tree)
+    for node in ast.walk(tree):
+        for rule in NODE_RULES.get(type(node), ()):
+            rule(node, analysis)
+    for line_number, line in enumerate(source.splitlines(), start=1):
+        for rule in LINE_RULES:
+            rule(line_number, line, analysis)
+    for rule in FINISH_RULES:
+        rule(analysis)
+
+    analysis.findings.sort(key=lambda finding: (finding.line, finding.column))
+    return analysis.findings
+
+
+def analyze_file(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return analyze_source(f.read(), file_path)
+
+
+@line_rule
+def line_too_long(line_number, line, analysis):
+    if len(line) > MAX_LINE_LENGTH:
+        analysis.report(line_number, 0, "line-too-long", "convention",
+                        f"Line too long ({len(line)}/{MAX_LINE_LENGTH})")
+
+
+@line_rule
+def trailing_whitespace(line_number, line, analysis):
+    if line != line.rstrip():
+        analysis.report(line_number, len(line.rstrip()), "trailing-whitespace", "convention", "Trailing whitespace")
+
+
+@node_rule(ast.Module)
+def missing_module_docstring(node, analysis):
+    if node.body and ast.get_docstring(node) is None:
+        analysis.report(1, 0, "missing-module-docstring", "convention", "Missing module docstring")
+
+
+@node_rule(ast.ClassDef)
+def missing_class_docstring(node, analysis):
+    if ast.get_docstring(node) is None:
+        analysis.report(node.lineno, node.col_offset, "missing-class-docstring", "convention",
+                        "Missing class docstring")
+
+
+@node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+def missing_function_docstring(node, analysis):
+    if ast.get_docstring(node) is None:
+        analysis.report(node.lineno, node.col_offset, "missing-function-docstring", "convention",
+                        "Missing function or method docstring")
+
+
+@node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+def function_too_long(node, analysis):
+    length = node.end_lineno - node.lineno + 1
+    if length > MAX_FUNCTION_LINES:
+        analysis.report(node.lineno, node.col_offset, "function-too-long", "refactor",
+                        f"Function '{node.name}' is too long ({length}/{MAX_FUNCTION_LINES} lines)")
+
+
+@node_rule(ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+def too_many_arguments(node, analysis):
+    arguments = node.args
+    count = len(arguments.posonlyargs) + len(arguments.args) + len(arguments.kwonlyargs)
+    if count > MAX_ARGUMENTS:
+        analysis.report(node.lineno, node.col_offset, "too-many-arguments", "refactor",
+                        f"Too many arguments ({count}/{MAX_ARGUMENTS})")
+
+
+@node_rule(ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+def dangerous_default_value(node, analysis):
+    for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+        if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+            analysis.report(default.lineno, default.col_offset, "dangerous-default-value", "warning",
+                            "Dangerous default value as argument")
+
+
+@node_rule(ast.Call)
+def print_call(node, analysis):
+    if isinstance(node.func, ast.Name) and node.func.id == "print":
+        analysis.report(node.lineno, node.col_offset, "print-call", "convention", "Avoid using 'print'")
+
+
+@node_rule(ast.ExceptHandler)
+def bare_except(node, analysis):
+    if node.type is None:
+        analysis.report(node.lineno, node.col_offset, "bare-except", "warning", "No exception type(s) specified")
+
+
+@node_rule(ast.Compare)
+def singleton_comparison(node, analysis):
+    for operator, comparator in zip(node.ops, node.comparators):
+        is_none = isinstance(comparator, ast.Constant) and comparator.value is None
+        if isinstance(operator, (ast.Eq, ast.NotEq)) and is_none:
+            analysis.report(node.lineno, node.col_offset, "singleton-comparison", "convention",
+                            "Comparison to None should use 'is' or 'is not'")
+
+
+@node_rule(ast.ImportFrom)
+def wildcard_import(node, analysis):
+    if any(alias.name == "*" for alias in node.names):
+        analysis.report(node.lineno, node.col_offset, "wildcard-import", "warning",
+                        f"Wildcard import {node.module or '.'}")
+
+
+@node_rule(ast.Import, ast.ImportFrom)
+def collect_imports(node, analysis):
+    imports = analysis.state.setdefault("imports", {})
+    for alias in node.names:
+        if alias.name == "*":
+            continue
+        name = alias.asname or alias.name.split(".")[0]
+        imports.setdefault(name, (node.lineno, node.col_offset, alias.name))
+
+
+@node_rule(ast.Name)
+def collect_names(node, analysis):
+    analysis.state.setdefault("names", set()).add(node.id)
+
+
+@finish_rule
+def unused_import(analysis):
+    names = analysis.state.get("names", set())
+    # Names listed in __all__ are re-exported, not unused
+    exported = {
+        element.value
+        for node in analysis.tree.body if isinstance(node, ast.Assign)
+        for target in node.targets if isinstance(target, ast.Name) and target.id == "__all__"
+        if isinstance(node.value, (ast.List, ast.Tuple))
+        for element in node.value.elts if isinstance(element, ast.Constant)
+    }
+    for name, (line, column, imported) in analysis.state.get("imports", {}).items():
+        if name not in names and name not in exported:
+            analysis.report(line, column, "unused-import", "warning", f"Unused import {imported}")
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+from collections import namedtuple
+import xml.etree.ElementTree as ET
+
+# One linter finding; file is None for findings not tied to a file (e.g. a tool failure)
+Finding = namedtuple("Finding", ["file", "line", "column", "rule", "severity", "message"])
+
+# Normalized severities, most severe first; tool severities are mapped onto these
+SEVERITIES = ("error", "warning", "refactor", "convention", "info")
+
+PYLINT_SEVERITIES = {
+    "fatal": "error", "error": "error", "warning": "warning",
+    "refactor": "refactor", "convention": "convention", "info": "info",
+}
+ESLINT_SEVERITIES = {2: "error", 1: "warning"}
+CPPCHECK_SEVERITIES = {
+    "error": "error", "warning": "warning", "performance": "warning", "portability": "warning",
+    "style": "convention", "information": "info",
+}
+TIDY_SEVERITIES = {"error": "error", "warning": "warning", "access": "warning", "info": "info", "config": "info"}
+
+# tidy -errors line format, with the message ID that --mute-id yes appends
+TIDY_LINE = re.compile(
+    r"^line (?P<line>\d+) column (?P<column>\d+) - (?P<severity>\w+): (?P<message>.*?)(?: \((?P<rule>[A-Z_]+)\))?$"
+)
+
+
+def tool_error(tool, text):
+    """
+    Finding reporting that a linter produced no parsable output.
+    """
+    lines = [line for line in (text or "").splitlines() if line.strip()]
+    detail = lines[0] if lines else "no output"
+    return Finding(None, 0, 0, f"{tool}-error", "error", f"{tool} failed: {detail}")
+
+
+def parse_pylint(stdout, stderr):
+    """
+    Parse pylint --output-format=json.
+    pylint prints [] for a clean file, so empty output (e.g. usage text on stderr after a bad
+    option) does not parse and is reported as a failure.
+    """
+    return [
+        Finding(item["path"], item["line"], item["column"], item["symbol"],
+                PYLINT_SEVERITIES.get(item["type"], "info"), item["message"])
+        for item in json.loads(stdout)
+    ]
+
+
+def parse_eslint(stdout, stderr):
+    """
+    Parse eslint -f json (one entry per file, each with its messages).
+    """
+    return [
+        Finding(result["filePath"], message.get("line", 0), message.get("column", 0),
+                message.get("ruleId") or "eslint", ESLINT_SEVERITIES.get(message.get("severity"), "warning"),
+                message["message"])
+        for result in json.loads(stdout)
+        for message in result["messages"]
+    ]
+
+
+def parse_cppcheck(stdout, stderr):
+    """
+    Parse cppcheck --xml, which is written to stderr.
+    Findings without a location (e.g. missing system includes) have no file.
+    """
+    findings = []
+    for error in ET.fromstring(stderr).iter("error"):
+        location = error.find("location")
+        if location is None:
+            file, line, column = None, 0, 0
+        else:
+            file, line, column = location.get("file"), int(location.get("line", 0)), int(location.get("column", 0))
+        findings.append(Finding(file, line, column, error.get("id"),
+                                CPPCHECK_SEVERITIES.get(error.get("severity"), "info"), error.get("msg")))
+    return findings
+
+
+def parse_tidy(stdout, stderr):
+    """
+    Parse tidy -errors output ("line L column C - Severity: message (ID)") from stderr.
+    tidy checks one file per run, so the caller fills in the file.
+    """
+    findings = []
+    for line in stderr.splitlines():
+        match = TIDY_LINE.match(line.strip())
+        if match:
+            findings.append(Finding(None, int(match["line"]), int(match["column"]), match["rule"] or "tidy",
+                                    TIDY_SEVERITIES.get(match["severity"].lower(), "info"), match["message"]))
+    return findings
+
+
+PARSERS = {"pylint": parse_pylint, "eslint": parse_eslint, "cppcheck": parse_cppcheck, "tidy": parse_tidy}
+
+
+def parse_findings(tool, stdout, stderr, file_paths):
+    """
+    Parse a linter's structured output into Findings whose file is one of file_paths
+    (as passed to the linter) when the reported file matches one of them.
+    With a single file, findings that name no file are given that file.
+    """
+    try:
+        findings = PARSERS[tool](stdout, stderr)
+    except (ValueError, KeyError, TypeError, ET.ParseError):
+        return [tool_error(tool, stderr or stdout)]
+
+    by_absolute_path = {os.path.abspath(path): path for path in file_paths}
+    default = file_paths[0] if len(file_paths) == 1 else None
+
+    def resolve(file):
+        if not file:
+            return default
+        return by_absolute_path.get(os.path.abspath(file), file)
+
+    return [finding._replace(file=resolve(finding.file)) for finding in findings]
+
+
+def format_finding(finding):
+    """
+    One line of text for a finding, in the linters' usual "file:line:column: rule: message" layout.
+    """
+    location = f"{finding.file}:{finding.line}:{finding.column}: " if finding.file else ""
+    return f"{location}{finding.rule}: {finding.message} ({finding.severity})"
+
+
+def format_findings(findings):
+    return "\n".join(format_finding(finding) for finding in findings)
+
+
+def digest_findings(findings, count_tokens, max_tokens):
+    """
+    Compact summarizer input: findings grouped by rule, one line per rule with its
+    first message and number of occurrences, most severe and most frequent rules first.
+    Lines are added while they fit in max_tokens as measured by count_tokens(text).
+    """
+    groups = {}
+    for finding in findings:
+        group = groups.get(finding.rule)
+        if group is None:
+            groups[finding.rule] = [finding, 1]
+        else:
+            group[1] += 1
+
+    rank = {severity: index for index, severity in enumerate(SEVERITIES)}
+    ranked = sorted(groups.values(), key=lambda group: (rank.get(group[0].severity, len(SEVERITIES)), -group[1]))
+
+    lines, used = [], 0
+    for finding, count in ranked:
+        occurrences = f", {count} occurrences" if count > 1 else ""
+        line = f"{finding.message} ({finding.severity}{occurrences})"
+        tokens = count_tokens(line) + 1  # Plus the newline
+        if used + tokens > max_tokens:
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines)
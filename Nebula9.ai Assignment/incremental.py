@@ -0,0 +1,171 @@
+"""
+Incremental re-analysis of Python files by top-level definition.
+
+A module is split into its top-level functions and classes ("units") and the
+rest ("module-level code"). When a new version of a file arrives, units whose
+source is unchanged, and that do not depend on a changed unit, keep the
+findings of the previous version. The linter then runs on a copy of the file
+in which their bodies are blanked out (line numbers are kept), and its findings
+for those line ranges are replaced by the previous ones. Any change to
+module-level code (imports, constants, statements) means a full analysis.
+"""
+import ast
+import hashlib
+from collections import namedtuple
+
+from findings import Finding
+
+# Name no module defines: stubbed functions return it, so their return value stays uninferable
+STUB_RESULT = "__codesentry_stub__"
+
+# A top-level function or class: its lines (decorators included), the line its body starts on
+# (None when the body shares a line with the header), a hash of its source, the names it
+# references, and whether it declares globals (it then cannot be stubbed)
+Unit = namedtuple("Unit", ["name", "kind", "start", "end", "body_start", "hash", "references", "declares_globals"])
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _names(node):
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+
+
+class ModuleUnits:
+    """
+    A Python module split into top-level units and module-level code.
+    Raises SyntaxError when the source does not parse.
+    """
+
+    def __init__(self, source):
+        self.lines = source.splitlines()
+        self.units = {}
+        self.duplicates = False
+        self.module_references = set()
+        self.module_names = set()  # Names bound at module level, including the units
+
+        module_lines = set(range(1, len(self.lines) + 1))
+        for node in ast.parse(source).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+                first = node.body[0]
+                inline = self.lines[first.lineno - 1][:first.col_offset].strip() != ""
+                if node.name in self.units:
+                    self.duplicates = True
+                self.units[node.name] = Unit(
+                    node.name,
+                    "class" if isinstance(node, ast.ClassDef) else "function",
+                    start,
+                    node.end_lineno,
+                    None if inline else first.lineno,
+                    _hash("\n".join(self.lines[start - 1:node.end_lineno])),
+                    _names(node),
+                    any(isinstance(child, ast.Global) for child in ast.walk(node)),
+                )
+                self.module_names.add(node.name)
+                module_lines.difference_update(range(start, node.end_lineno + 1))
+            else:
+                self.module_references |= _names(node)
+                for child in ast.walk(node):
+                    if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                        self.module_names.add(child.id)
+                    elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                        self.module_names.update(
+                            alias.asname or alias.name.split(".")[0] for alias in child.names if alias.name != "*"
+                        )
+
+        # Blank lines and trailing spaces between units do not count as a module-level change
+        self.module_hash = _hash("\n".join(
+            self.lines[number - 1].rstrip() for number in sorted(module_lines) if self.lines[number - 1].strip()
+        ))
+
+
+def plan_reanalysis(previous, current):
+    """
+    Return the names of the units that can keep their previous findings (an empty set
+    when nothing can be reused), given the snapshot of the previous version.
+    """
+    if previous is None or current.duplicates or previous["module_hash"] != current.module_hash:
+        return set()
+
+    old_units = previous["units"]
+    touched = {name for name, unit in current.units.items() if old_units.get(name, {}).get("hash") != unit.hash}
+    touched |= set(old_units) - set(current.units)
+    reusable = {
+        name for name, unit in current.units.items()
+        if name not in touched and not unit.references & touched
+        and unit.body_start is not None and not unit.declares_globals
+    }
+
+    # A class referenced by code that is analyzed again keeps its body, so attribute
+    # and inheritance checks still see it; repeat until no more classes are kept
+    while True:
+        referenced = set(current.module_references)
+        for name, unit in current.units.items():
+            if name not in reusable:
+                referenced |= unit.references
+        kept = {name for name in reusable if current.units[name].kind == "class" and name in referenced}
+        if not kept:
+            return reusable
+        reusable -= kept
+
+
+def stub_source(current, reusable):
+    """
+    Source for the linter with the bodies of the reusable units blanked out.
+    Lines keep their numbers. Each blanked body still uses the module-level names it used,
+    so they are not reported as unused (findings inside the blanked units are discarded).
+    """
+    lines = list(current.lines)
+    for name in reusable:
+        unit = current.units[name]
+        body_line = lines[unit.body_start - 1]
+        indent = body_line[:len(body_line) - len(body_line.lstrip())]
+        used = sorted(unit.references & current.module_names)
+        keep_alive = f"({', '.join(used)},); " if used else ""
+        lines[unit.body_start - 1] = indent + keep_alive + ("pass" if unit.kind == "class" else f"return {STUB_RESULT}")
+        for index in range(unit.body_start, unit.end):
+            lines[index] = ""
+    return "\n".join(lines) + "\n"
+
+
+def merge_findings(fresh, current, reusable, previous, file_path):
+    """
+    Combine the findings of the stubbed run (outside the reusable units) with the
+    previous findings of the reusable units, moved to where the units are now.
+    """
+    ranges = [(current.units[name].start, current.units[name].end) for name in reusable]
+    findings = [
+        finding for finding in fresh
+        if finding.line <= len(current.lines) and not any(start <= finding.line <= end for start, end in ranges)
+    ]
+    for name in reusable:
+        start = current.units[name].start
+        findings.extend(
+            Finding(file_path, start + offset, column, rule, severity, message)
+            for offset, column, rule, severity, message in previous["units"][name]["findings"]
+        )
+    findings.sort(key=lambda finding: (finding.line, finding.column))
+    return findings
+
+
+def snapshot(current, findings):
+    """
+    State kept for the next version: module-level hash, and each unit's hash and
+    findings (lines relative to the unit's first line).
+    """
+    owners = [None] * (len(current.lines) + 2)
+    for name, unit in current.units.items():
+        for line in range(unit.start, unit.end + 1):
+            owners[line] = name
+
+    units = {name: {"hash": unit.hash, "findings": []} for name, unit in current.units.items()}
+    for finding in findings:
+        owner = owners[finding.line] if 0 < finding.line < len(owners) else None
+        if owner is not None:
+            units[owner]["findings"].append([
+                finding.line - current.units[owner].start, finding.column, finding.rule, finding.severity,
+                finding.message,
+            ])
+    return {"module_hash": current.module_hash, "units": units}
@@ -0,0 +1,156 @@
+import os
+import time
+import uuid
+import queue
+import threading
+
+
+# The job being run by the current worker thread
+_current = threading.local()
+
+
+def report_progress(done, total):
+    """
+    Record progress on the job running in this thread (no-op outside a job).
+    """
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job["progress"] = {"done": done, "total": total}
+
+
+def report_timings(timings):
+    """
+    Record (stage, seconds) pairs on the job running in this thread (no-op outside a job).
+    """
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job["timings"] = timings
+
+
+class QueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue is at capacity.
+    """
+
+
+class JobQueue:
+    """
+    Bounded queue of analysis jobs served by a fixed pool of worker threads.
+    Jobs are identified by a random ID and can be polled until they finish.
+    Finished jobs are forgotten after retention_seconds.
+    """
+
+    def __init__(self, workers=2, max_queue=32, retention_seconds=3600):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._running = 0
+        self._pid = None
+
+    def _ensure_started(self):
+        """
+        Start the worker threads on first use in this process.
+        Threads do not survive fork, so a forked worker starts its own pool.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._running = 0
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue func(*args, **kwargs) and return the new job ID.
+        Raises QueueFull when max_queue jobs are already waiting.
+        """
+        self._ensure_started()
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "progress": None,
+            "timings": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFull(f"Job queue is full ({self.max_queue} jobs waiting).")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Return a snapshot of the job, or None for an unknown job ID.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _work(self):
+        while True:
+            job_id, func, args, kwargs = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job["status"] = "running"
+                    job["started"] = time.time()
+                self._running += 1
+            _current.job = job
+            try:
+                result = func(*args, **kwargs)
+                update = {"status": "finished", "result": result}
+            except Exception as e:
+                update = {"status": "failed", "error": str(e)}
+            finally:
+                _current.job = None
+                self._queue.task_done()
+            with self._lock:
+                self._running -= 1
+                if job is not None:
+                    job.update(update, finished=time.time())
+
+    def _prune(self):
+        """
+        Forget finished jobs older than the retention period.
+        """
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished"] is not None and job["finished"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self):
+        """
+        Return pool size, queue depth and job counts by status.
+        """
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "jobs": counts,
+            }
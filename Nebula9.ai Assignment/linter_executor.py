@@ -0,0 +1,131 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+class LinterQueueFull(Exception):
+    """
+    Raised when a linter run is requested while max_waiting runs are already waiting.
+    """
+
+
+class _Waiter:
+    def __init__(self, tool, processes):
+        self.tool = tool
+        self.processes = processes
+        self.overtaken = 0  # Runs that arrived later but started first
+
+
+class LinterExecutor:
+    """
+    Central admission control for linter processes.
+    At most max_processes linter processes run at a time, and at most tool_limits[tool] of
+    one tool. Runs beyond the limits wait in arrival order; when max_waiting runs are already
+    waiting, further runs are rejected with LinterQueueFull.
+    A run may hold several process slots (e.g. pylint -j 4 holds 4). A waiting run may be
+    overtaken by later runs that fit at most max_overtakes times, so large runs are not starved.
+    """
+
+    def __init__(self, max_processes, tool_limits=None, max_waiting=64, max_overtakes=8):
+        self.max_processes = max(1, max_processes)
+        self.tool_limits = dict(tool_limits or {})
+        self.max_waiting = max_waiting
+        self.max_overtakes = max_overtakes
+        self._condition = threading.Condition()
+        self._waiters = []  # Waiting runs, oldest first
+        self._running = {}  # Tool -> process slots in use
+        self._busy_seconds = {}  # Tool -> process-seconds held, for utilization
+        self._wait_seconds = {}  # Tool -> seconds spent waiting for slots
+        self.started = time.time()
+        self.rejected = 0
+
+    def _limit(self, tool):
+        return min(self.tool_limits.get(tool, self.max_processes), self.max_processes)
+
+    def _fits(self, tool, processes):
+        total = sum(self._running.values())
+        return (total + processes <= self.max_processes
+                and self._running.get(tool, 0) + processes <= self._limit(tool))
+
+    def _may_start(self, waiter):
+        """
+        A waiting run starts once it fits and no run that has waited longer fits,
+        so runs of a tool at its own limit do not hold up runs of other tools.
+        A run that has waited longer and was overtaken max_overtakes times holds up the rest.
+        """
+        position = self._waiters.index(waiter)
+        return self._fits(waiter.tool, waiter.processes) and not any(
+            self._fits(older.tool, older.processes) or older.overtaken >= self.max_overtakes
+            for older in self._waiters[:position]
+        )
+
+    def accepting(self):
+        """
+        Whether a new run would be admitted or queued rather than rejected.
+        """
+        with self._condition:
+            return len(self._waiters) < self.max_waiting
+
+    @contextmanager
+    def slot(self, tool, processes=1):
+        """
+        Hold process slots for one run of tool, waiting for them if the limits are reached,
+        and yield the number of slots granted: processes, capped at the tool's limit. Runs that
+        start several processes (pylint -j) must start no more than that.
+        Raises LinterQueueFull when the wait queue is full.
+        """
+        processes = max(1, min(processes, self._limit(tool)))
+        waiter = _Waiter(tool, processes)
+        waited = time.perf_counter()
+        with self._condition:
+            self._waiters.append(waiter)
+            started = False
+            try:
+                if not self._may_start(waiter):
+                    if len(self._waiters) > self.max_waiting:
+                        self.rejected += 1
+                        raise LinterQueueFull(f"Linter queue is full ({self.max_waiting} runs waiting).")
+                    self._condition.wait_for(lambda: self._may_start(waiter))
+                started = True
+            finally:
+                position = self._waiters.index(waiter)
+                if started:
+                    for older in self._waiters[:position]:
+                        older.overtaken += 1
+                del self._waiters[position]
+                self._condition.notify_all()
+            self._running[tool] = self._running.get(tool, 0) + processes
+            self._wait_seconds[tool] = self._wait_seconds.get(tool, 0) + time.perf_counter() - waited
+
+        started = time.perf_counter()
+        try:
+            yield processes
+        finally:
+            with self._condition:
+                self._running[tool] -= processes
+                held = processes * (time.perf_counter() - started)
+                self._busy_seconds[tool] = self._busy_seconds.get(tool, 0) + held
+                self._condition.notify_all()
+
+    def stats(self):
+        """
+        Return limits, running and waiting runs by tool, cumulative busy and wait seconds by tool,
+        and overall utilization (busy process-seconds over max_processes since start).
+        """
+        with self._condition:
+            waiting = {}
+            for waiter in self._waiters:
+                waiting[waiter.tool] = waiting.get(waiter.tool, 0) + 1
+            busy = sum(self._busy_seconds.values())
+            elapsed = max(time.time() - self.started, 1e-9)
+            return {
+                "max_processes": self.max_processes,
+                "tool_limits": dict(self.tool_limits),
+                "max_waiting": self.max_waiting,
+                "running": dict(self._running),
+                "waiting": waiting,
+                "rejected": self.rejected,
+                "busy_seconds": dict(self._busy_seconds),
+                "wait_seconds": dict(self._wait_seconds),
+                "utilization": busy / (elapsed * self.max_processes),
+            }
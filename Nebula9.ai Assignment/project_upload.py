@@ -0,0 +1,129 @@
+import os
+import stat
+import tarfile
+import zipfile
+
+from werkzeug.utils import secure_filename
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar.gz", ".tgz")
+
+# Bytes copied at a time when writing uploaded or extracted files
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class ProjectLimitError(ValueError):
+    """
+    Raised when a project upload has too many files or too many bytes.
+    """
+
+
+def archive_extension(filename):
+    """
+    Return the archive extension of a file name, or None when it is not a supported archive.
+    """
+    lower = filename.lower()
+    for extension in ARCHIVE_EXTENSIONS:
+        if lower.endswith(extension):
+            return extension
+    return None
+
+
+def safe_relative_path(name):
+    """
+    Turn an uploaded or archived file name into a relative path of secure_filename parts.
+    Returns None for absolute paths, parent directory references and names with no usable part.
+    """
+    parts = name.replace("\\", "/").split("/")
+    if (parts[0] == "" and len(parts) > 1) or ".." in parts or ":" in parts[0]:
+        return None
+    cleaned = [secure_filename(part) for part in parts if part not in ("", ".")]
+    if not cleaned or not all(cleaned):
+        return None
+    return os.path.join(*cleaned)
+
+
+class ProjectWriter:
+    """
+    Writes the files of a multi-file or archive upload under one directory.
+    Only files with one of the given extensions are kept; the others are listed in skipped.
+    The file count and total size limits are checked against the bytes actually written,
+    so archive headers that understate member sizes do not get past them.
+    """
+
+    def __init__(self, root, extensions, max_files=500, max_bytes=50 * 1024 * 1024):
+        self.root = root
+        self.extensions = tuple(extensions)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.files = []
+        self.skipped = []
+        self.bytes = 0
+        os.makedirs(root, exist_ok=True)
+
+    def add(self, name, source):
+        """
+        Copy a file object into the project under name (made safe first).
+        """
+        relative = safe_relative_path(name)
+        if relative is None or not relative.endswith(self.extensions):
+            self.skipped.append(name)
+            return
+        if len(self.files) >= self.max_files:
+            raise ProjectLimitError(f"more than {self.max_files} files")
+
+        # Several uploaded files can share a name; keep them all
+        base, extension = os.path.splitext(relative)
+        copy = 1
+        while os.path.exists(os.path.join(self.root, relative)):
+            copy += 1
+            relative = f"{base}_{copy}{extension}"
+
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            while True:
+                block = source.read(COPY_BLOCK_SIZE)
+                if not block:
+                    break
+                self.bytes += len(block)
+                if self.bytes > self.max_bytes:
+                    raise ProjectLimitError(f"more than {self.max_bytes} bytes of files")
+                target.write(block)
+        self.files.append(relative)
+
+    def add_archive(self, filename, source):
+        """
+        Extract the regular files of a .zip or .tar.gz archive read from a seekable file object.
+        Links, devices and directories are not extracted.
+        """
+        if archive_extension(filename) == ".zip":
+            with zipfile.ZipFile(source) as archive:
+                for member in archive.infolist():
+                    if member.is_dir():
+                        continue
+                    if stat.S_ISLNK(member.external_attr >> 16):
+                        self.skipped.append(member.filename)
+                        continue
+                    with archive.open(member) as member_file:
+                        self.add(member.filename, member_file)
+        else:
+            with tarfile.open(fileobj=source, mode="r:gz") as archive:
+                for member in archive:
+                    if member.isdir():
+                        continue
+                    if not member.isfile():
+                        self.skipped.append(member.name)
+                        continue
+                    with archive.extractfile(member) as member_file:
+                        self.add(member.name, member_file)
+
+
+def group_by_extension(paths):
+    """
+    Group file paths by extension (one group per linter), keeping their order.
+    """
+    groups = {}
+    for path in paths:
+        groups.setdefault(os.path.splitext(path)[1], []).append(path)
+    return groups
+
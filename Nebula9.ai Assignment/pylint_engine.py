@@ -0,0 +1,200 @@
+import io
+import os
+import sys
+import json
+import queue
+import sysconfig
+import threading
+import subprocess
+from contextlib import redirect_stdout
+
+# Standard library modules parsed by astroid when a worker starts,
+# so the first uploads do not pay for their inference
+WARM_MODULES = ["os", "sys", "re", "json", "subprocess", "collections", "typing", "datetime"]
+
+
+class PylintEngineError(Exception):
+    """
+    Raised when a resident pylint worker cannot be started or stops responding.
+    """
+
+
+class _Worker:
+    """
+    A long-lived Python process with pylint imported, serving one lint job at a time
+    over JSON lines on its stdin/stdout.
+    """
+
+    def __init__(self, python):
+        self.jobs = 0
+        try:
+            self.process = subprocess.Popen(
+                [python, os.path.abspath(__file__)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError as e:
+            raise PylintEngineError(f"Could not start pylint worker: {e}")
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, args, timeout, stdin=None):
+        timer = threading.Timer(timeout, self.process.kill)
+        timer.start()
+        try:
+            self.process.stdin.write(json.dumps({"args": args, "stdin": stdin}) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except OSError as e:
+            raise PylintEngineError(f"pylint worker stopped responding: {e}")
+        finally:
+            timer.cancel()
+
+        if not line:
+            if self.process.poll() is not None and self.process.returncode < 0:
+                raise subprocess.TimeoutExpired(["pylint"] + args, timeout)
+            raise PylintEngineError("pylint worker exited unexpectedly")
+        self.jobs += 1
+        return json.loads(line)
+
+    def stop(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+
+class PylintEngine:
+    """
+    Pool of resident pylint workers.
+    Each worker keeps pylint imported and the standard library and installed packages
+    (starting with the WARM_MODULES) in astroid's module cache across uploads; the uploaded
+    files are parsed again for each job, as a pylint process would. A worker is recycled
+    after max_jobs runs to contain memory growth.
+    """
+
+    def __init__(self, workers=1, max_jobs=200, python=sys.executable):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.python = python
+        self._idle = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self.recycled = 0
+
+    def _ensure_started(self):
+        """
+        Create the idle-worker queue on first use in this process.
+        Workers are started lazily, so a forked process never shares its parent's pipes.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._idle = queue.Queue()
+            for _ in range(self.workers):
+                self._idle.put(None)
+
+    def run(self, args, timeout=30, stdin=None):
+        """
+        Lint with the given pylint command-line arguments.
+        stdin is the text pylint reads with --from-stdin.
+        Returns the same stdout the pylint command would print.
+        """
+        self._ensure_started()
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive():
+                worker = _Worker(self.python)
+            result = worker.run(args, timeout, stdin)
+            if worker.jobs >= self.max_jobs:
+                worker.stop()
+                worker = None
+                self.recycled += 1
+            return result["stdout"]
+        except (PylintEngineError, subprocess.TimeoutExpired):
+            if worker is not None:
+                worker.process.kill()
+            worker = None
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def stats(self):
+        """
+        Return pool size and the number of recycled workers.
+        """
+        return {"workers": self.workers, "max_jobs": self.max_jobs, "recycled": self.recycled}
+
+
+def library_paths():
+    """
+    Directories of the standard library and installed packages, whose modules do not change between jobs.
+    """
+    paths = sysconfig.get_paths()
+    return tuple({
+        os.path.join(os.path.realpath(paths[key]), "")
+        for key in ("stdlib", "platstdlib", "purelib", "platlib") if key in paths
+    })
+
+
+def is_job_file(path, libraries):
+    return path is not None and not os.path.realpath(path).startswith(libraries)
+
+
+def forget_job_modules(manager, libraries):
+    """
+    Drop what astroid cached from the linted files (modules outside the standard library and
+    installed packages), so a file changed at the same path, or a changed module it imports,
+    is parsed again. Library modules stay cached for the next job.
+    """
+    for name, module in list(manager.astroid_cache.items()):
+        if is_job_file(getattr(module, "file", None), libraries):
+            del manager.astroid_cache[name]
+    # Module name -> file lookups made from, or resolved to, a linted file, and failed lookups,
+    # may resolve differently for the next job
+    for (name, context), spec in list(manager._mod_file_cache.items()):
+        if (is_job_file(context, libraries) or isinstance(spec, Exception)
+                or is_job_file(getattr(spec, "location", None), libraries)):
+            del manager._mod_file_cache[(name, context)]
+
+
+def serve():
+    """
+    Worker loop: read lint jobs from stdin and write their output to stdout.
+    """
+    channel, requests = sys.stdout, sys.stdin
+    from astroid import MANAGER
+    from pylint.lint import Run
+
+    for name in WARM_MODULES:
+        try:
+            MANAGER.ast_from_module_name(name)
+        except Exception:
+            pass
+    libraries = library_paths()
+
+    for line in requests:
+        request = json.loads(line)
+        output = io.StringIO()
+        # pylint --from-stdin reads sys.stdin as a binary stream decoded as UTF-8
+        if request.get("stdin") is not None:
+            sys.stdin = io.TextIOWrapper(io.BytesIO(request["stdin"].encode("utf-8")), encoding="utf-8")
+        with redirect_stdout(output):
+            try:
+                returncode = Run(request["args"], exit=False).linter.msg_status
+            except SystemExit as e:
+                returncode = e.code if isinstance(e.code, int) else 1
+            finally:
+                sys.stdin = requests
+                forget_job_modules(MANAGER, libraries)
+        channel.write(json.dumps({"stdout": output.getvalue(), "returncode": returncode}) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    serve()
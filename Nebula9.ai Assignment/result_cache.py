@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 hex digest of a file, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts):
+    """
+    Build a cache key from the given parts (content digest, tool name,
+    tool version, flags, ...). Any JSON-serializable value is accepted.
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for analysis results:
+    - An in-memory LRU tier holding the most recently used entries.
+    - An on-disk tier (one JSON file per key) evicted by total size,
+      least recently used first. A cache_dir of None keeps the cache in memory only.
+      Once the tier exceeds max_disk_bytes it is shrunk to disk_low_water of that size,
+      so the directory is not scanned again on every following put.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, cache_dir, max_memory_entries=256, max_disk_bytes=256 * 1024 * 1024, disk_low_water=0.9):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_low_water = disk_low_water
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir is None:
+            return
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        for path in self._disk_entries():
+            self._disk_bytes += os.path.getsize(path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _disk_entries(self):
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None when it is not cached.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self.cache_dir is None:
+                self.misses += 1
+                return None
+
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used for disk eviction
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Store value under key in both tiers.
+        """
+        with self._lock:
+            self._remember(key, value)
+        if self.cache_dir is None:
+            return
+
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(temp_path, path)
+            with self._lock:
+                self._disk_bytes += os.path.getsize(path) - previous_size
+        except OSError as e:
+            print(f"Could not write cache entry {key}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """
+        Remove least recently used disk entries until the tier fits within
+        disk_low_water * max_disk_bytes.
+        """
+        target = self.disk_low_water * self.max_disk_bytes
+        entries = []
+        for path in self._disk_entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self):
+        """
+        Return hit/miss counters and tier sizes.
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
@@ -0,0 +1,108 @@
+"""
+Production launcher: app.py on gunicorn, with the app preloaded before the workers fork.
+
+The master process imports the app, loads the summarization model once and freezes the
+garbage collector's view of everything loaded so far (gunicorn's preload_app), then gunicorn
+forks the workers. Workers share the model weights copy-on-write (no per-worker load, so they
+are ready as soon as they start) and serve requests on threads (gthread workers). A post_fork
+hook limits each worker's torch to its share of the CPU cores and starts its upload retention
+thread; passes in several workers are safe, as uploads in use hold a lease every process
+respects and the counters are shared under upload/. gunicorn replaces a worker that exits.
+
+Usage: python serve.py [--bind 0.0.0.0:8000] [--workers 4] [--threads 8] [--torch-threads 2]
+"""
+import os
+import gc
+import sys
+import argparse
+import threading
+
+from gunicorn.app.base import BaseApplication
+
+
+def limit_torch_threads(threads):
+    """
+    Cap intra-op parallelism in this process; torch is only configured if the model loaded it.
+    """
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def post_fork(threads):
+    """
+    gunicorn post_fork hook for a worker: limit torch and start the upload retention thread.
+    """
+    def hook(_server, worker):
+        limit_torch_threads(threads)
+        store = sys.modules["app"].UPLOAD_STORE
+        if store.interval_seconds > 0:
+            threading.Thread(target=store.serve_retention, name="upload-retention", daemon=True).start()
+        print(f"Worker {worker.pid} started, {threads} torch threads")
+
+    return hook
+
+
+class PreloadedApplication(BaseApplication):
+    """
+    gunicorn application for app.py, loaded in the master process (preload_app).
+    """
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        import app
+
+        if app.SUMMARIZER_WARMUP:
+            app.initialize_code_interpreter()
+        print(f"Master {os.getpid()}: model {app.MODEL_STATE['status']}")
+        # Objects created so far are never collected, so the collector does not write to
+        # (and un-share) the pages holding the model in the workers
+        gc.collect()
+        gc.freeze()
+        return app.app
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Serve app.py with pre-forked workers sharing one model.")
+    parser.add_argument("--bind", default=os.environ.get("SERVE_BIND", "0.0.0.0:8000"))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SERVE_WORKERS", str(min(cpus, 4)))))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("SERVE_THREADS", "8")),
+                        help="request threads per worker")
+    parser.add_argument("--torch-threads", type=int, default=int(os.environ.get("TORCH_THREADS", "0")),
+                        help="torch threads per worker (default: CPU count / workers)")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+    threads = args.torch_threads or max(1, cpus // workers)
+
+    # Read by the OpenMP/MKL runtimes when torch is imported; the workers also set torch's own limit
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(threads))
+    # Each worker has its own linter limiter: split the cores between them
+    os.environ.setdefault("LINTER_MAX_PROCESSES", str(max(1, cpus // workers)))
+    # The model is loaded in the master, before forking, rather than on a warm-up thread in each worker
+    os.environ["SUMMARIZER_PRELOAD"] = "1"
+    # Upload retention is started by the post_fork hook, so the store does not start its own thread on first use
+    os.environ["UPLOAD_RETENTION_THREAD"] = "0"
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # app.py resolves upload/ and cache/ from here
+    sys.path.insert(0, os.getcwd())
+    PreloadedApplication({
+        "bind": args.bind,
+        "workers": workers,
+        "worker_class": "gthread",
+        "threads": max(1, args.threads),
+        "preload_app": True,
+        "post_fork": post_fork(threads),
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
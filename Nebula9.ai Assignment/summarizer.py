@@ -0,0 +1,407 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+# Inference backends for the summarization model on CPU
+SUMMARIZER_BACKENDS = ("fp32", "int8", "bf16")
+
+# Weight of the latest batch in the moving average of batch generation time
+BATCH_SECONDS_SMOOTHING = 0.2
+
+
+def cpu_supports_bf16():
+    """
+    Return True when the CPU has native bfloat16 instructions (AVX512-BF16 or AMX).
+    """
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    flags = line.split(":", 1)[1].split()
+                    return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        pass
+    return False
+
+
+def load_summarization_pipeline(model_name, backend="fp32"):
+    """
+    Build the summarization pipeline with the requested inference backend:
+    - fp32: the model as published.
+    - int8: Linear layers dynamically quantized to int8 (CPU only).
+    - bf16: weights and activations in bfloat16, when the CPU supports it.
+    On GPU, or when the backend is not supported, the fp32 pipeline is used.
+    Returns (pipeline, backend actually used).
+    """
+    import torch
+    from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+
+    if backend not in SUMMARIZER_BACKENDS:
+        raise ValueError(f"Unknown summarizer backend '{backend}', expected one of {SUMMARIZER_BACKENDS}")
+
+    if torch.cuda.is_available():
+        return pipeline("summarization", model=model_name, device=0), "fp32"
+
+    if backend == "bf16" and not cpu_supports_bf16():
+        print("CPU has no native bfloat16 support, using the fp32 summarizer instead.")
+        backend = "fp32"
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    dtype = torch.bfloat16 if backend == "bf16" else torch.float32
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=dtype)
+    if backend == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1), backend
+
+
+def load_summary_tokenizer(model_name):
+    """
+    Load only the model's tokenizer, for processes that count and chunk summarizer input
+    but leave generation to the summarization server.
+    """
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(model_name)
+
+
+def results_or_cancel(futures, on_result=None):
+    """
+    The results of futures, in order; when one fails, the others are cancelled before re-raising.
+    on_result(done) is called as each result is collected, done being the number collected so far.
+    """
+    results = []
+    try:
+        for future in futures:
+            results.append(future.result())
+            if on_result is not None:
+                on_result(len(results))
+        return results
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+class _SummaryRequest:
+    def __init__(self, text, generation_kwargs, deadline=None):
+        self.text = text
+        self.generation_kwargs = generation_kwargs
+        self.params_key = tuple(sorted(generation_kwargs.items()))
+        self.future = Future()
+        self.enqueued = time.monotonic()
+        self.deadline = deadline
+
+
+class SummaryBatcher:
+    """
+    Micro-batching front end for the summarization pipeline.
+    Concurrent requests are collected for up to max_wait_ms (or until max_batch_size
+    requests are waiting), summarized with one batched call per set of generation
+    parameters, and the results handed back to each caller.
+    Requests whose Future was cancelled before their batch starts are dropped, and so are
+    those that would finish after their deadline (time.monotonic()) at the recent time per batch.
+    """
+
+    def __init__(self, get_pipeline, max_batch_size=8, max_wait_ms=20):
+        self.get_pipeline = get_pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+        self.batch_sizes = {}
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+        self.cancelled = 0
+        self.expired = 0
+        self.batch_seconds = None  # Moving average of the generation time of one batch
+        self._busy = False
+
+    def _ensure_started(self):
+        """
+        Start the batching thread on first use in this process.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            threading.Thread(target=self._work, name="summary-batcher", daemon=True).start()
+
+    def submit(self, text, deadline=None, **generation_kwargs):
+        """
+        Queue a summarization request and return a Future for the summary text.
+        The request is dropped with TimeoutError if it cannot be summarized by deadline.
+        """
+        self._ensure_started()
+        request = _SummaryRequest(text, generation_kwargs, deadline)
+        self._queue.put(request)
+        return request.future
+
+    def summarize(self, text, **generation_kwargs):
+        """
+        Summarize one text, sharing a batched pipeline call with concurrent requests.
+        """
+        return self.submit(text, **generation_kwargs).result()
+
+    def estimate_seconds(self):
+        """
+        Expected time for a request submitted now to be summarized: the batches ahead of it
+        and its own at the recent time per batch, or None before the first batch.
+        """
+        with self._lock:
+            if self.batch_seconds is None:
+                return None
+            batches = self._queue.qsize() // self.max_batch_size + 1 + (1 if self._busy else 0)
+            return self.max_wait + batches * self.batch_seconds
+
+    def summarize_many(self, texts, **generation_kwargs):
+        """
+        Summarize several texts with the same generation parameters.
+        When one fails, those not yet started are cancelled.
+        """
+        futures = [self.submit(text, **generation_kwargs) for text in texts]
+        return results_or_cancel(futures)
+
+    def _collect(self):
+        """
+        Block for the next request, then gather more until the batch is full or the window closes.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.params_key, []).append(request)
+            for group in groups.values():
+                self._run(group)
+
+    def _run(self, group):
+        started = time.monotonic()
+        finish = started + (self.batch_seconds or 0)
+        live = []
+        for request in group:
+            if not request.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self.cancelled += 1
+            elif request.deadline is not None and finish > request.deadline:
+                request.future.set_exception(TimeoutError("Summary would not be ready by its deadline."))
+                with self._lock:
+                    self.expired += 1
+            else:
+                live.append(request)
+        group = live
+        if not group:
+            return
+
+        with self._lock:
+            self.batch_sizes[len(group)] = self.batch_sizes.get(len(group), 0) + 1
+            for request in group:
+                wait = started - request.enqueued
+                self.requests += 1
+                self.total_wait += wait
+                self.max_wait_seen = max(self.max_wait_seen, wait)
+
+        pipeline = self.get_pipeline()
+        if pipeline is None:
+            for request in group:
+                request.future.set_exception(RuntimeError("Summarization model not loaded."))
+            return
+
+        with self._lock:
+            self._busy = True
+        generation_started = time.monotonic()
+        try:
+            self._generate(pipeline, group)
+        finally:
+            seconds = time.monotonic() - generation_started
+            with self._lock:
+                self._busy = False
+                if self.batch_seconds is None:
+                    self.batch_seconds = seconds
+                else:
+                    self.batch_seconds += BATCH_SECONDS_SMOOTHING * (seconds - self.batch_seconds)
+
+    def _generate(self, pipeline, group):
+        if len(group) == 1:
+            self._run_single(pipeline, group[0])
+            return
+
+        texts = [request.text for request in group]
+        try:
+            outputs = pipeline(texts, batch_size=len(texts), truncation=True, **group[0].generation_kwargs)
+        except Exception:
+            # Retry one by one so a single bad input does not fail the whole batch
+            for request in group:
+                self._run_single(pipeline, request)
+            return
+
+        for request, output in zip(group, outputs):
+            request.future.set_result(output["summary_text"])
+
+    def _run_single(self, pipeline, request):
+        try:
+            output = pipeline(request.text, truncation=True, **request.generation_kwargs)
+            request.future.set_result(output[0]["summary_text"])
+        except Exception as e:
+            request.future.set_exception(e)
+
+    def stats(self):
+        """
+        Return the batch-size distribution and queue wait statistics.
+        """
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "requests": self.requests,
+                "cancelled": self.cancelled,
+                "expired": self.expired,
+                "batch_seconds": self.batch_seconds,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "queue_wait_ms": {
+                    "mean": self.total_wait / self.requests * 1000 if self.requests else 0.0,
+                    "max": self.max_wait_seen * 1000,
+                },
+            }
+
+
+def stream_summary(pipeline, text, token_timeout=60, **generation_kwargs):
+    """
+    Generate a summary with the pipeline's model, yielding text pieces as tokens are produced.
+    transformers' streamer does not support beam search, so decoding is greedy (num_beams=1).
+    An error in generation is raised here, and so is TimeoutError when no token arrives
+    for token_timeout seconds.
+    """
+    from transformers import TextIteratorStreamer
+
+    tokenizer, model = pipeline.tokenizer, pipeline.model
+    inputs = tokenizer(text, return_tensors="pt", truncation=True).to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=token_timeout)
+    generation_kwargs = dict(generation_kwargs, num_beams=1, streamer=streamer)
+    failures = []
+
+    def generate():
+        try:
+            model.generate(**inputs, **generation_kwargs)
+        except Exception as e:
+            # Without end() the consumer would wait for tokens that never come
+            failures.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, name="summary-stream", daemon=True)
+    thread.start()
+    try:
+        for piece in streamer:
+            if piece:
+                yield piece
+    except queue.Empty:
+        raise TimeoutError(f"No summary token generated for {token_timeout} seconds.")
+    thread.join()
+    if failures:
+        raise failures[0]
+
+
+def iter_token_chunks(blocks, tokenizer, max_tokens):
+    """
+    Group consecutive text blocks (lines, paragraphs or pages) into chunks of at
+    most max_tokens tokens, measured with the model's tokenizer.
+    Blocks longer than max_tokens are split on token boundaries.
+    The input is consumed lazily, so callers can stop early without tokenizing the rest.
+    """
+    current, current_tokens = [], 0
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        token_ids = tokenizer.encode(block, add_special_tokens=False)
+
+        if current and current_tokens + len(token_ids) > max_tokens:
+            yield "\n".join(current)
+            current, current_tokens = [], 0
+
+        if len(token_ids) > max_tokens:
+            for start in range(0, len(token_ids), max_tokens):
+                yield tokenizer.decode(token_ids[start:start + max_tokens])
+            continue
+
+        current.append(block)
+        current_tokens += len(token_ids)
+
+    if current:
+        yield "\n".join(current)
+
+
+def summarize_long_text(blocks, batcher, tokenizer, max_chunk_tokens, max_chunks,
+                        chunk_kwargs, summary_kwargs, progress=None, deadline=None):
+    """
+    Map-reduce summarization for documents longer than the model's input window:
+    - Map: split the text into token-bounded chunks (at most max_chunks) and
+      summarize them in batches with chunk_kwargs.
+    - Reduce: summarize the joined chunk summaries with summary_kwargs, first
+      re-chunking them if they still do not fit in one window.
+    progress(done, total) is called as chunk summaries complete.
+    Every model request carries deadline, so the batcher fails it (TimeoutError) when it cannot be met;
+    when a chunk fails, the chunks not yet started are cancelled.
+    Returns (summary, number of chunks summarized, whether the text was cut off).
+    """
+    def report(done, total):
+        if progress is not None:
+            progress(done, total)
+
+    chunks = iter_token_chunks(blocks, tokenizer, max_chunk_tokens)
+    first = next(chunks, None)
+    if first is None:
+        return "", 0, False
+    second = next(chunks, None)
+    if second is None:
+        # Fits in one window: no reduce pass needed
+        report(0, 1)
+        summary = batcher.summarize(first, deadline=deadline, **summary_kwargs)
+        report(1, 1)
+        return summary, 1, False
+
+    # Chunks are submitted as soon as they are cut, so tokenizing overlaps with generation
+    futures = [batcher.submit(first, deadline=deadline, **chunk_kwargs),
+               batcher.submit(second, deadline=deadline, **chunk_kwargs)]
+    truncated = False
+    for chunk in chunks:
+        if len(futures) >= max_chunks:
+            truncated = True
+            break
+        futures.append(batcher.submit(chunk, deadline=deadline, **chunk_kwargs))
+
+    total = len(futures) + 1
+    # When a chunk fails the summary cannot be completed: the chunks still waiting for the model are cancelled
+    summaries = results_or_cancel(futures, lambda done: report(done, total))
+
+    while len(summaries) > 1:
+        combined = "\n".join(summaries)
+        if len(tokenizer.encode(combined, add_special_tokens=False)) <= max_chunk_tokens:
+            break
+        regrouped = list(iter_token_chunks(summaries, tokenizer, max_chunk_tokens))
+        if len(regrouped) >= len(summaries):
+            break
+        summaries = batcher.summarize_many(regrouped, deadline=deadline, **chunk_kwargs)
+
+    summary = batcher.summarize("\n".join(summaries), deadline=deadline, **summary_kwargs)
+    report(total, total)
+    return summary, len(futures), truncated
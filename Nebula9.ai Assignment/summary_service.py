@@ -0,0 +1,423 @@
+"""
+Local summarization server and its client.
+
+The server is a long-lived process holding the only copy of the summarization model.
+Web processes reach it over a Unix domain socket, so requests from all of them are
+batched together. Messages are JSON objects, each sent as one frame: a 4-byte
+big-endian length followed by that many bytes of UTF-8 JSON.
+
+Requests (each with a client-chosen "id", echoed in the response):
+- {"op": "summarize", "text": ..., "kwargs": {generation parameters}, "deadline_ms": ...}
+  -> {"id": ..., "summary": ...} or {"id": ..., "error": ...}; a request that cannot be
+  summarized within deadline_ms fails with "expired": true
+- {"op": "cancel", "target": id of a summarize request}: drop it if it has not started
+- {"op": "stats"} -> {"id": ..., "stats": {...}}
+Requests still waiting when their connection closes are cancelled.
+
+Usage: python summary_service.py [--socket /tmp/codesentry-summarizer.sock]
+"""
+import os
+import json
+import time
+import socket
+import select
+import struct
+import argparse
+import itertools
+import threading
+from concurrent.futures import Future
+from functools import partial
+
+from summarizer import BATCH_SECONDS_SMOOTHING, SummaryBatcher, load_summarization_pipeline, results_or_cancel
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+RECV_SIZE = 64 * 1024
+
+# How often a client connection checks its requests for expired deadlines
+REAP_INTERVAL = 0.5
+
+
+class SummaryServerUnavailable(Exception):
+    """
+    Raised when the summarization server cannot be reached or the connection to it is lost.
+    """
+
+
+def encode_frame(message):
+    payload = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameBuffer:
+    """
+    Reassembles frames from bytes received in arbitrary pieces.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Add received bytes and return the messages completed by them.
+        Raises ValueError on a frame larger than MAX_FRAME_BYTES or invalid JSON.
+        """
+        self.buffer += data
+        messages = []
+        while len(self.buffer) >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer)
+            if length > MAX_FRAME_BYTES:
+                raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+            end = FRAME_HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            messages.append(json.loads(bytes(self.buffer[FRAME_HEADER.size:end]).decode("utf-8")))
+            del self.buffer[:end]
+        return messages
+
+
+class SummaryServer:
+    """
+    Serves summarization requests from a SummaryBatcher over a Unix domain socket,
+    one thread per client connection.
+    """
+
+    def __init__(self, socket_path, batcher):
+        self.socket_path = socket_path
+        self.batcher = batcher
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Left over from a previous run
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        listener.listen(64)
+        print(f"Summarization server listening on {self.socket_path}")
+        while True:
+            connection, _address = listener.accept()
+            threading.Thread(target=self._serve_connection, args=(connection,), name="summary-client",
+                             daemon=True).start()
+
+    def _serve_connection(self, connection):
+        write_lock = threading.Lock()
+        pending = {}
+
+        def reply(message):
+            with write_lock:
+                try:
+                    connection.sendall(encode_frame(message))
+                except OSError:
+                    pass  # The client went away; its requests are cancelled below
+
+        def finished(request_id, future):
+            pending.pop(request_id, None)
+            if future.cancelled():
+                reply({"id": request_id, "error": "Cancelled.", "cancelled": True})
+            elif isinstance(future.exception(), TimeoutError):
+                reply({"id": request_id, "error": str(future.exception()), "expired": True})
+            elif future.exception() is not None:
+                reply({"id": request_id, "error": str(future.exception())})
+            else:
+                reply({"id": request_id, "summary": future.result()})
+
+        with self._lock:
+            self.connections += 1
+        frames = FrameBuffer()
+        try:
+            for data in iter(lambda: connection.recv(RECV_SIZE), b""):
+                for message in frames.feed(data):
+                    request_id, op = message.get("id"), message.get("op")
+                    if op == "summarize":
+                        deadline = None
+                        if message.get("deadline_ms"):
+                            deadline = time.monotonic() + message["deadline_ms"] / 1000
+                        future = self.batcher.submit(message["text"], deadline=deadline, **message.get("kwargs", {}))
+                        pending[request_id] = future
+                        future.add_done_callback(partial(finished, request_id))
+                    elif op == "cancel":
+                        future = pending.get(message.get("target"))
+                        if future is not None:
+                            future.cancel()
+                    elif op == "stats":
+                        reply({"id": request_id, "stats": self.stats()})
+                    else:
+                        reply({"id": request_id, "error": f"Unknown operation {op!r}."})
+        except (OSError, ValueError) as e:
+            print(f"Summarization client connection failed: {e}")
+        finally:
+            for future in list(pending.values()):
+                future.cancel()
+            with self._lock:
+                self.connections -= 1
+            connection.close()
+
+    def stats(self):
+        with self._lock:
+            connections = self.connections
+        return dict(self.batcher.stats(), connections=connections)
+
+
+class _Connection:
+    """
+    One client connection, carrying several requests at a time: responses are matched to
+    requests by ID on a reader thread, which also fails requests past their deadline.
+    """
+
+    def __init__(self, socket_path, connect_timeout):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(connect_timeout)
+            self.sock.connect(socket_path)
+            self.sock.settimeout(None)
+        except OSError:
+            self.sock.close()
+            raise
+        self.closed = False
+        self.pending = {}  # Request ID -> (Future, deadline)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        threading.Thread(target=self._read, name="summary-connection", daemon=True).start()
+
+    def _send(self, message):
+        with self._lock:
+            self.sock.sendall(encode_frame(message))
+
+    def _cancel(self, request_id):
+        try:
+            self._send({"op": "cancel", "target": request_id})
+        except OSError:
+            pass
+
+    def request(self, message, timeout):
+        """
+        Send a request and return a Future for its response message.
+        Cancelling the Future cancels the request on the server.
+        """
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            if self.closed:
+                raise SummaryServerUnavailable("Connection to the summarization server is closed.")
+            self.pending[request_id] = (future, time.monotonic() + timeout)
+        try:
+            self._send(dict(message, id=request_id))
+        except OSError as e:
+            self.close(SummaryServerUnavailable(f"Summarization server connection lost: {e}"))
+        future.add_done_callback(lambda done: done.cancelled() and self._cancel(request_id))
+        return future
+
+    def _read(self):
+        frames = FrameBuffer()
+        error = SummaryServerUnavailable("Summarization server closed the connection.")
+        try:
+            while True:
+                readable, _writable, _errors = select.select([self.sock], [], [], REAP_INTERVAL)
+                if not readable:
+                    self._expire()
+                    continue
+                data = self.sock.recv(RECV_SIZE)
+                if not data:
+                    break
+                for message in frames.feed(data):
+                    with self._lock:
+                        future, _deadline = self.pending.pop(message.get("id"), (None, None))
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                self._expire()
+        except (OSError, ValueError) as e:
+            error = SummaryServerUnavailable(f"Summarization server connection lost: {e}")
+        self.close(error)
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [request_id for request_id, (_future, deadline) in self.pending.items() if deadline < now]
+            futures = [self.pending.pop(request_id)[0] for request_id in expired]
+        for request_id, future in zip(expired, futures):
+            self._cancel(request_id)
+            if not future.done():
+                future.set_exception(TimeoutError("Summarization server did not answer in time."))
+
+    def close(self, error):
+        """
+        Close the connection and fail its outstanding requests with error.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            futures = [future for future, _deadline in self.pending.values()]
+            self.pending.clear()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+
+class SummaryClient:
+    """
+    Client for SummaryServer with the submit/summarize/summarize_many/stats interface of
+    SummaryBatcher, so it can take the batcher's place in the web processes.
+    Keeps a pool of pool_size connections, used in turn and reopened when they fail.
+    After a failed connection attempt the server counts as down for retry_seconds, and
+    requests fail at once with SummaryServerUnavailable instead of waiting on it.
+    """
+
+    def __init__(self, socket_path, pool_size=2, timeout=120, retry_seconds=5, connect_timeout=1):
+        self.socket_path = socket_path
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.connect_timeout = connect_timeout
+        self._connections = []
+        self._next = 0
+        self._down_until = 0.0
+        self._pid = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.unavailable = 0
+        self.latency_seconds = None  # Moving average of the time summaries take, as seen by this client
+
+    def _connection(self):
+        with self._lock:
+            # Connections (and their reader threads) are not shared with forked processes
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._connections = [None] * self.pool_size
+            if time.monotonic() < self._down_until:
+                raise SummaryServerUnavailable(f"Summarization server at {self.socket_path} is unavailable.")
+            index = self._next % self.pool_size
+            self._next += 1
+            connection = self._connections[index]
+            if connection is None or connection.closed:
+                try:
+                    connection = _Connection(self.socket_path, self.connect_timeout)
+                except OSError as e:
+                    self._down_until = time.monotonic() + self.retry_seconds
+                    raise SummaryServerUnavailable(
+                        f"Summarization server at {self.socket_path} is unavailable: {e}"
+                    )
+                self._connections[index] = connection
+            return connection
+
+    def available(self):
+        """
+        Whether the server can be reached (opening a pool connection if needed).
+        """
+        try:
+            self._connection()
+            return True
+        except SummaryServerUnavailable:
+            return False
+
+    def _call(self, message, timeout):
+        try:
+            return self._connection().request(message, timeout)
+        except SummaryServerUnavailable:
+            with self._lock:
+                self.unavailable += 1
+            raise
+
+    def submit(self, text, deadline=None, **generation_kwargs):
+        """
+        Send a summarization request and return a Future for the summary text.
+        It fails with TimeoutError when it cannot be summarized within the client's timeout,
+        or by deadline (time.monotonic()) when that is sooner.
+        """
+        with self._lock:
+            self.requests += 1
+        summary = Future()
+        submitted = time.monotonic()
+        timeout = self.timeout if deadline is None else min(self.timeout, deadline - submitted)
+        if timeout <= 0:
+            summary.set_exception(TimeoutError("Summary deadline has passed."))
+            return summary
+        try:
+            response = self._call(
+                {"op": "summarize", "text": text, "kwargs": generation_kwargs, "deadline_ms": timeout * 1000},
+                timeout,
+            )
+        except SummaryServerUnavailable as e:
+            summary.set_exception(e)
+            return summary
+
+        def resolve(done):
+            if done.cancelled():
+                return
+            if done.exception() is not None:
+                summary.set_exception(done.exception())
+            elif done.result().get("expired"):
+                summary.set_exception(TimeoutError(done.result()["error"]))
+            elif "error" in done.result():
+                summary.set_exception(RuntimeError(done.result()["error"]))
+            else:
+                self._observe(time.monotonic() - submitted)
+                summary.set_result(done.result()["summary"])
+
+        response.add_done_callback(resolve)
+        # Cancelling the summary cancels the request on the server
+        summary.add_done_callback(lambda done: done.cancelled() and response.cancel())
+        return summary
+
+    def summarize(self, text, **generation_kwargs):
+        return self.submit(text, **generation_kwargs).result()
+
+    def _observe(self, seconds):
+        with self._lock:
+            if self.latency_seconds is None:
+                self.latency_seconds = seconds
+            else:
+                self.latency_seconds += BATCH_SECONDS_SMOOTHING * (seconds - self.latency_seconds)
+
+    def estimate_seconds(self):
+        """
+        Expected time for a summary requested now: the recent time summaries took, queueing
+        on the server included, or None before the first one.
+        """
+        with self._lock:
+            return self.latency_seconds
+
+    def summarize_many(self, texts, **generation_kwargs):
+        futures = [self.submit(text, **generation_kwargs) for text in texts]
+        return results_or_cancel(futures)
+
+    def stats(self):
+        """
+        Return the server's batching statistics with this client's counters, or the
+        counters alone (and empty batching statistics) when the server is down.
+        """
+        with self._lock:
+            client = {"socket": self.socket_path, "pool_size": self.pool_size, "requests": self.requests,
+                      "unavailable": self.unavailable, "latency_seconds": self.latency_seconds}
+        try:
+            server = self._call({"op": "stats"}, self.connect_timeout).result(self.connect_timeout * 2)["stats"]
+            server["available"] = True
+        except Exception:
+            server = {"available": False, "batch_sizes": {}, "queue_wait_ms": {}}
+        return dict(server, client=client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the summarization model over a Unix domain socket.")
+    parser.add_argument("--socket", default=os.environ.get("SUMMARY_SERVER_SOCKET") or "/tmp/codesentry-summarizer.sock")
+    parser.add_argument("--model", default=os.environ.get("SUMMARIZER_MODEL", "facebook/bart-large-cnn"))
+    parser.add_argument("--backend", default=os.environ.get("SUMMARIZER_BACKEND", "fp32"))
+    parser.add_argument("--batch-size", type=int, default=int(os.environ.get("SUMMARY_BATCH_SIZE", "8")))
+    parser.add_argument("--batch-wait-ms", type=float, default=float(os.environ.get("SUMMARY_BATCH_WAIT_MS", "20")))
+    args = parser.parse_args()
+
+    print(f"Loading summarization model {args.model} ({args.backend})...")
+    pipeline, backend = load_summarization_pipeline(args.model, args.backend)
+    print(f"Model loaded ({backend}).")
+    batcher = SummaryBatcher(lambda: pipeline, max_batch_size=args.batch_size, max_wait_ms=args.batch_wait_ms)
+    SummaryServer(args.socket, batcher).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
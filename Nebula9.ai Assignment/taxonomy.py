@@ -0,0 +1,71 @@
+import re
+import json
+
+# Rules of this taxonomy section (reports that an analysis failed) apply to findings of every tool
+COMMON_TOOL = "codesentry"
+
+
+class Taxonomy:
+    """
+    Maps findings to categories.
+    Rule IDs listed in the taxonomy file are looked up by (tool, rule ID) in a dict built once
+    at load time, as tools may use the same ID for different problems; findings with other
+    rules fall back to one compiled keyword pattern over the rule and message, where the first
+    keyword found in the text decides.
+    Findings matching neither are left uncategorized.
+    """
+
+    def __init__(self, categories, rules, keywords):
+        self.categories = list(categories)
+        self.index = {}
+        for tool, tool_rules in rules.items():
+            for category, rule_ids in tool_rules.items():
+                self._check_category(category, tool)
+                for rule_id in rule_ids:
+                    if self.index.setdefault((tool, rule_id), category) != category:
+                        raise ValueError(f"Rule {rule_id!r} of {tool!r} is listed under two categories")
+
+        # One named group per category, e.g. (?P<c0>line\ too\ long|readable)|(?P<c1>unused|...)
+        self.group_categories = {}
+        groups = []
+        for number, (category, words) in enumerate(keywords.items()):
+            self._check_category(category, "keywords")
+            self.group_categories[f"c{number}"] = category
+            groups.append(f"(?P<c{number}>{'|'.join(re.escape(word) for word in words)})")
+        self.pattern = re.compile("|".join(groups), re.IGNORECASE) if groups else None
+
+    def _check_category(self, category, section):
+        if category not in self.categories:
+            raise ValueError(f"Unknown category {category!r} in taxonomy section {section!r}")
+
+    @classmethod
+    def load(cls, path, categories):
+        """
+        Read a taxonomy file mapping rule IDs and keywords to the given categories:
+        {"rules": {tool: {category: [rule IDs]}}, "keywords": {category: [words]}}.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(categories, data.get("rules", {}), data.get("keywords", {}))
+
+    def category_of(self, finding, tool):
+        """
+        Return the category of a finding reported by tool, or None.
+        """
+        category = self.index.get((tool, finding.rule)) or self.index.get((COMMON_TOOL, finding.rule))
+        if category is not None or self.pattern is None:
+            return category
+        # Not the severity: every "error" finding would match the Error keywords
+        match = self.pattern.search(f"{finding.rule} {finding.message}")
+        return self.group_categories[match.lastgroup] if match else None
+
+    def categorize(self, findings, tool):
+        """
+        Group findings of tool by category in one pass: {category: [findings]} for every category.
+        """
+        categories = {category: [] for category in self.categories}
+        for finding in findings:
+            category = self.category_of(finding, tool)
+            if category is not None:
+                categories[category].append(finding)
+        return categories
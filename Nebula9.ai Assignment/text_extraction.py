@@ -0,0 +1,79 @@
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+TEXT_DOCUMENT_TYPES = (".txt", ".docx", ".pdf")
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WORD_PARAGRAPH = f"{WORD_NAMESPACE}p"
+WORD_TEXT = f"{WORD_NAMESPACE}t"
+
+
+class DocumentText:
+    """
+    Streams the text of a .txt, .docx or .pdf file one block at a time
+    (a line, a paragraph or a page) without holding the whole document in memory.
+    Iteration stops once max_pages PDF pages or max_bytes of text have been read;
+    truncated is then set to True.
+    """
+
+    def __init__(self, file_path, max_pages=500, max_bytes=20 * 1024 * 1024):
+        extension = os.path.splitext(file_path)[1]
+        if extension not in TEXT_DOCUMENT_TYPES:
+            raise ValueError(f"Unsupported text document type: {extension}")
+        self.file_path = file_path
+        self.extension = extension
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pages = 0
+        self.bytes = 0
+        self.truncated = False
+
+    def __iter__(self):
+        readers = {".txt": self._iter_txt, ".docx": self._iter_docx, ".pdf": self._iter_pdf}
+        for block in readers[self.extension]():
+            self.bytes += len(block.encode("utf-8"))
+            if self.bytes > self.max_bytes:
+                self.truncated = True
+                return
+            yield block
+
+    def _iter_txt(self):
+        with open(self.file_path, "r", encoding="utf-8", errors="replace") as f:
+            yield from f
+
+    def _iter_pdf(self):
+        from PyPDF2 import PdfReader  # Import for .pdf files
+
+        # Pages are parsed on access, so only the current page is held in memory
+        reader = PdfReader(self.file_path)
+        for page in reader.pages:
+            if self.pages >= self.max_pages:
+                self.truncated = True
+                return
+            self.pages += 1
+            yield page.extract_text() or ""
+
+    def _iter_docx(self):
+        """
+        Read word/document.xml with an incremental parser, yielding each paragraph's
+        text and discarding finished elements as it goes.
+        """
+        with zipfile.ZipFile(self.file_path) as archive:
+            with archive.open("word/document.xml") as document:
+                ancestors = []
+                for event, element in ET.iterparse(document, events=("start", "end")):
+                    if event == "start":
+                        ancestors.append(element)
+                        continue
+
+                    ancestors.pop()
+                    # Paragraphs nested in another paragraph (text boxes) are read with their parent
+                    if element.tag == WORD_PARAGRAPH and not any(
+                        ancestor.tag == WORD_PARAGRAPH for ancestor in ancestors
+                    ):
+                        yield "".join(node.text or "" for node in element.iter(WORD_TEXT))
+
+                    # Drop finished top-level blocks (paragraphs, tables) from <w:body>
+                    if len(ancestors) == 2:
+                        ancestors[-1].remove(element)
@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:  # No flock: uploads in use are only protected within this process
+    fcntl = None
+
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadStore:
+    """
+    Disk storage for uploads under one root folder:
+    - blobs/: single-file uploads, stored once per content (SHA-256) and extension;
+      uploading the same content again returns a reference to the stored blob.
+    - projects/: one folder per multi-file or archive upload.
+    - tmp/: uploads being streamed to disk.
+    Entries handed out by save() or new_project() are in use until release(); the
+    retention pass removes unused entries older than ttl_seconds (by last use), then the
+    least recently used ones until the store fits within max_bytes.
+    An entry in use is held open with a shared flock, so the retention pass of any process
+    sharing root leaves it alone. With retention_thread=False no process-local thread runs
+    the pass; serve_retention() is then run elsewhere (serve.py starts it in each worker).
+    Retention counters are kept in retention.json under root, so every process sharing root
+    reports the passes run by any of them.
+    """
+
+    def __init__(self, root, ttl_seconds=24 * 3600, max_bytes=1024 * 1024 * 1024, interval_seconds=600,
+                 retention_thread=True):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.retention_thread = retention_thread
+        self.blob_dir = os.path.join(root, "blobs")
+        self.project_dir = os.path.join(root, "projects")
+        self.temp_dir = os.path.join(root, "tmp")
+        self.report_path = os.path.join(root, "retention.json")
+        for folder in (self.blob_dir, self.project_dir, self.temp_dir):
+            os.makedirs(folder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._in_use = {}  # Entry path -> [number of uploads using it, descriptor holding its lease]
+        self._pid = None
+        self.saved = 0
+        self.deduplicated = 0
+
+    def _ensure_started(self):
+        """
+        Start the retention thread on first use in this process (threads do not survive fork).
+        """
+        with self._lock:
+            if self._pid == os.getpid() or self.interval_seconds <= 0 or not self.retention_thread:
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self.serve_retention, name="upload-retention", daemon=True).start()
+
+    def serve_retention(self):
+        """
+        Run the retention pass every interval_seconds, forever.
+        """
+        while True:
+            time.sleep(self.interval_seconds)
+            try:
+                self.apply_retention()
+            except Exception as e:
+                print(f"Upload retention failed: {e}")
+
+    def _acquire(self, path):
+        """
+        Count one more use of path (the caller holds self._lock). The first use opens it and
+        takes a shared lock on it. Returns False when path was removed before it was locked.
+        """
+        entry = self._in_use.get(path)
+        if entry is None:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                return False
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+            try:
+                current = os.path.samestat(os.fstat(fd), os.stat(path))
+            except FileNotFoundError:
+                current = False
+            if not current:  # Removed (or replaced) by a retention pass while we waited for the lock
+                os.close(fd)
+                return False
+            entry = self._in_use[path] = [0, fd]
+        entry[0] += 1
+        return True
+
+    def release(self, path):
+        """
+        Mark an entry returned by save() or new_project() as no longer used by its upload.
+        """
+        with self._lock:
+            entry = self._in_use.get(path)
+            if entry is None:
+                return
+            entry[0] -= 1
+            if entry[0] <= 0:
+                del self._in_use[path]
+                os.close(entry[1])
+
+    def save(self, stream, extension):
+        """
+        Stream an upload to disk in blocks while hashing it, and return the path of its blob.
+        The returned path is in use until release(path).
+        """
+        self._ensure_started()
+        temp_path = os.path.join(self.temp_dir, f"{uuid.uuid4().hex}{extension}")
+        digest = hashlib.sha256()
+        try:
+            with open(temp_path, "wb") as f:
+                for block in iter(lambda: stream.read(COPY_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    f.write(block)
+
+            # The blob name must be a valid module name for pylint, hence the prefix
+            digest = digest.hexdigest()
+            path = os.path.join(self.blob_dir, digest[:2], f"blob_{digest}{extension}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                # Retry if another process's retention pass removes the blob before it is locked
+                while True:
+                    if os.path.exists(path) and self._acquire(path):
+                        self.deduplicated += 1
+                        os.utime(path)  # Mark as recently used for retention
+                        break
+                    # A link rather than a rename, so the upload is still there if the blob is lost again
+                    try:
+                        os.link(temp_path, path)
+                    except FileExistsError:
+                        continue
+                    if self._acquire(path):
+                        self.saved += 1
+                        break
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+    def new_project(self):
+        """
+        Create and return an empty folder for a multi-file or archive upload,
+        in use until release(folder).
+        """
+        self._ensure_started()
+        folder = os.path.join(self.project_dir, uuid.uuid4().hex)
+        os.makedirs(folder)
+        with self._lock:
+            self._acquire(folder)
+        return folder
+
+    def _entries(self):
+        """
+        (last use, size, path) of each blob and project folder.
+        """
+        entries = []
+        for root, _dirs, files in os.walk(self.blob_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        for name in os.listdir(self.project_dir):
+            folder = os.path.join(self.project_dir, name)
+            size = 0
+            for root, _dirs, files in os.walk(folder):
+                for file_name in files:
+                    try:
+                        size += os.path.getsize(os.path.join(root, file_name))
+                    except OSError:
+                        pass
+            try:
+                entries.append((os.path.getmtime(folder), size, folder))
+            except OSError:
+                continue
+        return entries
+
+    def _remove(self, path):
+        """
+        Remove an entry unless an upload in this or another process is using it.
+        """
+        with self._lock:
+            if path in self._in_use:
+                return False
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                return False
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # Fails while another process holds a lease
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                return False
+            finally:
+                os.close(fd)
+        return True
+
+    def apply_retention(self):
+        """
+        Remove unused entries past their TTL, then unused least recently used entries while
+        the store is over max_bytes. Returns {"entries", "bytes", "remaining_bytes"}.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        cutoff = time.time() - self.ttl_seconds
+        reclaimed_entries = reclaimed_bytes = 0
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                reclaimed_entries += 1
+                reclaimed_bytes += size
+
+        # Leftovers of uploads interrupted while streaming
+        for name in os.listdir(self.temp_dir):
+            path = os.path.join(self.temp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    reclaimed_entries += 1
+                    reclaimed_bytes += size
+            except OSError:
+                pass
+
+        report = {"entries": reclaimed_entries, "bytes": reclaimed_bytes, "remaining_bytes": total}
+        self._record_retention(report)
+        print(f"Upload retention: removed {reclaimed_entries} entries, reclaimed {reclaimed_bytes} bytes, "
+              f"{total} bytes remain")
+        return report
+
+    def _read_retention(self):
+        """
+        Retention counters of all processes sharing root, as last written to retention.json.
+        """
+        totals = {"retention_runs": 0, "reclaimed_entries": 0, "reclaimed_bytes": 0, "last_retention": None}
+        try:
+            with open(self.report_path, "r", encoding="utf-8") as f:
+                totals.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return totals
+
+    def _record_retention(self, report):
+        """
+        Add a retention pass to the counters in retention.json. The file is replaced atomically,
+        so readers never see it half written; a lock file serializes passes of several processes.
+        """
+        with open(f"{self.report_path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            totals = self._read_retention()
+            totals["retention_runs"] += 1
+            totals["reclaimed_entries"] += report["entries"]
+            totals["reclaimed_bytes"] += report["bytes"]
+            totals["last_retention"] = dict(report, time=time.time())
+            temp_path = f"{self.report_path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(totals, f)
+                os.replace(temp_path, self.report_path)
+            except OSError as e:
+                print(f"Could not write upload retention report: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def stats(self):
+        """
+        Return save and deduplication counters of this process, and retention counters
+        of all processes sharing root.
+        """
+        with self._lock:
+            stats = {
+                "saved": self.saved,
+                "deduplicated": self.deduplicated,
+                "in_use": len(self._in_use),
+            }
+        stats.update(self._read_retention())
+        return stats